@@ -0,0 +1 @@
+"""Environment benchmarks (run as ``python -m bench.<name>`` from the repo root)."""
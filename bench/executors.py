@@ -0,0 +1,189 @@
+"""Benchmark computer executors: per-action latency, CPU and bytes per backend.
+
+Runs the same action script against a local fixture page (loaded with
+``setup.load_html_content``) through each available backend. The X backends
+drive the real display, so run under Xvfb with the browser headed
+(PLAYWRIGHT_HEADLESS=0); the playwright backend also works headless.
+CPU covers the whole process tree (driver and browser included), sampled
+from /proc in clock ticks, so means need a few dozen repeats to be stable.
+
+Output is one JSON line per (backend, action), sorted, so reports from two
+releases can be diffed directly or compared with ``--baseline``.
+
+Usage:
+    python -m bench.executors --backends playwright xdo pyautogui --json > executors.jsonl
+    python -m bench.executors --baseline executors.jsonl
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from bench.procs import cpu_seconds, process_tree
+from setup import load_html_content
+from tools.browser import DISPLAY_HEIGHT, DISPLAY_WIDTH, BrowserExecutor, PlaywrightTool
+
+BACKENDS = ("playwright", "xdo", "pyautogui")
+
+FIXTURE = """
+<!doctype html>
+<body style="margin:0; font: 16px sans-serif">
+  <button id="button" style="position:absolute; left:100px; top:100px; width:200px; height:60px">
+    Click me
+  </button>
+  <input id="input" type="text" style="position:absolute; left:100px; top:200px; width:600px">
+  <div id="drag" style="position:absolute; left:100px; top:300px; width:800px; height:300px;
+       background:lavender"></div>
+  <div style="position:absolute; top:700px; height:5000px; width:10px"></div>
+  <script>
+    let clicks = 0;
+    document.getElementById("button").onclick = () => { clicks += 1; };
+  </script>
+</body>
+"""
+
+TEXT = "The quick brown fox jumps over the lazy dog"
+
+
+def _cpu_seconds() -> float:
+    """CPU of this process tree: the Playwright driver, Chromium and its
+    renderers run as descendants, and reaped children (xdotool) count too."""
+    return cpu_seconds(process_tree([os.getpid()]))
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return round(ordered[index], 3)
+
+
+def make_executor(backend: str, tool: PlaywrightTool) -> Any | None:
+    if backend == "playwright":
+        return BrowserExecutor(tool)
+    if backend == "xdo":
+        from hud.tools.executors.xdo import XDOExecutor
+
+        return XDOExecutor() if XDOExecutor.is_available() else None
+    if backend == "pyautogui":
+        from hud.tools.executors.pyautogui import PyAutoGUIExecutor
+
+        return PyAutoGUIExecutor() if PyAutoGUIExecutor.is_available() else None
+    raise ValueError(f"Unknown backend {backend!r}")
+
+
+def script(page: Any) -> list[tuple[str, Any, Any]]:
+    """(action, prepare, run) triples; ``prepare`` is not timed."""
+
+    async def focus_input() -> None:
+        await page.fill("#input", "")
+        await page.focus("#input")
+
+    async def top() -> None:
+        await page.evaluate("window.scrollTo(0, 0)")
+
+    async def noop() -> None:
+        return None
+
+    drag_path = [(150, 350), (400, 450), (650, 400), (850, 550)]
+    return [
+        ("click", noop, lambda ex: ex.click(x=200, y=130, take_screenshot=False)),
+        ("type", focus_input, lambda ex: ex.write(TEXT, take_screenshot=False)),
+        ("scroll", top, lambda ex: ex.scroll(x=960, y=540, scroll_y=5, take_screenshot=False)),
+        ("drag", noop, lambda ex: ex.drag(drag_path, take_screenshot=False)),
+        ("screenshot", noop, lambda ex: ex.screenshot()),
+        ("zoom", noop, lambda ex: ex.zoom(100, 100, 580, 370, DISPLAY_WIDTH // 2, DISPLAY_HEIGHT // 2)),
+    ]
+
+
+async def bench(backends: list[str], repeats: int) -> list[dict]:
+    tool = PlaywrightTool()
+    await tool._ensure_browser()
+    loaded = await load_html_content(tool, FIXTURE)
+    if not loaded["success"]:
+        raise RuntimeError(f"Fixture failed to load: {loaded['error']}")
+
+    results = []
+    try:
+        for backend in backends:
+            executor = make_executor(backend, tool)
+            if executor is None:
+                results.append({"backend": backend, "action": "*", "available": False})
+                continue
+            for action, prepare, run in script(tool.page):
+                await prepare()
+                await run(executor)  # warm-up
+                times, cpu, sizes, errors = [], [], [], 0
+                for _ in range(repeats):
+                    await prepare()
+                    cpu_start = _cpu_seconds()
+                    start = time.perf_counter()
+                    result = await run(executor)
+                    times.append((time.perf_counter() - start) * 1000)
+                    cpu.append((_cpu_seconds() - cpu_start) * 1000)
+                    image = result if isinstance(result, str) else getattr(result, "base64_image", None)
+                    if image:
+                        sizes.append(len(image) * 3 // 4)
+                    if getattr(result, "error", None) or result is None:
+                        errors += 1
+                times.sort()
+                results.append(
+                    {
+                        "backend": backend,
+                        "action": action,
+                        "available": True,
+                        "repeats": repeats,
+                        "ms_p50": _percentile(times, 0.5),
+                        "ms_p95": _percentile(times, 0.95),
+                        "cpu_ms_mean": round(sum(cpu) / len(cpu), 3),
+                        "bytes_mean": round(sum(sizes) / len(sizes)) if sizes else 0,
+                        "errors": errors,
+                    }
+                )
+    finally:
+        await tool.close()
+    return sorted(results, key=lambda r: (r["backend"], r["action"]))
+
+
+def load_baseline(path: Path) -> dict[tuple[str, str], dict]:
+    rows = [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+    return {(r["backend"], r["action"]): r for r in rows}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--baseline", type=Path, help="Earlier --json output to compare p50 against")
+    parser.add_argument("--json", action="store_true", help="Print JSON lines only")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DISPLAY", ":1")
+    results = asyncio.run(bench(args.backends, args.repeats))
+    if args.json:
+        for row in results:
+            print(json.dumps(row, sort_keys=True))
+        return
+
+    baseline = load_baseline(args.baseline) if args.baseline else {}
+    print(
+        f"{'backend':<10} {'action':<11} {'p50 ms':>9} {'p95 ms':>9} {'cpu ms':>8} "
+        f"{'bytes':>9} {'err':>4}" + (f" {'vs base':>8}" if baseline else "")
+    )
+    for row in results:
+        if not row["available"]:
+            print(f"{row['backend']:<10} unavailable")
+            continue
+        line = (
+            f"{row['backend']:<10} {row['action']:<11} {row['ms_p50']:>9} {row['ms_p95']:>9} "
+            f"{row['cpu_ms_mean']:>8} {row['bytes_mean']:>9} {row['errors']:>4}"
+        )
+        base = baseline.get((row["backend"], row["action"]))
+        if base and base.get("ms_p50"):
+            line += f" {(row['ms_p50'] / base['ms_p50'] - 1) * 100:>+7.1f}%"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Measure env.py import time and baseline RSS against a budget.
+
+Runs ``import env`` in a fresh interpreter with ``-X importtime`` and reports
+the total, the slowest top-level imports and the peak RSS after import.
+Exits non-zero when the total exceeds the budget, so it can gate CI.
+
+Usage:
+    python -m bench.import_time --budget-ms 1500
+    COMPUTER_TOOLS=anthropic python -m bench.import_time --top 15
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = "import env, resource; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+
+
+def measure(module: str) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.replace("env", module, 1)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    # "import time: self [us] | cumulative | imported package"; nesting is
+    # shown by indenting the package name, top-level imports have none.
+    top_level: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        package = fields[2][1:]
+        if not package.startswith(" "):
+            top_level[package.strip()] = int(fields[1])
+    return {
+        "module": module,
+        "total_ms": round(sum(top_level.values()) / 1000, 1),
+        "rss_mb": round(int(proc.stdout.strip().splitlines()[-1]) / 1024, 1),
+        "top": sorted(
+            ({"module": k, "ms": round(v / 1000, 1)} for k, v in top_level.items()),
+            key=lambda r: -r["ms"],
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="env")
+    parser.add_argument(
+        "--budget-ms", type=float, default=float(os.environ.get("IMPORT_BUDGET_MS", "2000"))
+    )
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="Print JSON only")
+    args = parser.parse_args()
+
+    report = measure(args.module)
+    report["top"] = report["top"][: args.top]
+    report["budget_ms"] = args.budget_ms
+    report["within_budget"] = report["total_ms"] <= args.budget_ms
+
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print(
+            f"import {report['module']}: {report['total_ms']} ms "
+            f"(budget {args.budget_ms:.0f} ms), RSS {report['rss_mb']} MB"
+        )
+        for row in report["top"]:
+            print(f"  {row['ms']:>9} ms  {row['module']}")
+    if not report["within_budget"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
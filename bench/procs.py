@@ -0,0 +1,75 @@
+"""Process-tree sampling from /proc for the benchmarks (Linux only)."""
+import os
+from pathlib import Path
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK")
+
+
+def _stat_fields(pid: int) -> list[str]:
+    # The command name (field 2) may contain spaces; fields after it are plain
+    raw = Path(f"/proc/{pid}/stat").read_text()
+    return raw[raw.rindex(")") + 2 :].split()
+
+
+def _parents() -> dict[int, int]:
+    parents = {}
+    for proc in Path("/proc").iterdir():
+        if not proc.name.isdigit():
+            continue
+        try:
+            parents[int(proc.name)] = int(_stat_fields(int(proc.name))[1])
+        except (OSError, ValueError, IndexError):
+            continue
+    return parents
+
+
+def process_tree(roots: list[int]) -> set[int]:
+    """``roots`` and all their living descendants."""
+    parents = _parents()
+    tree = {pid for pid in roots if pid in parents}
+    grew = True
+    while grew:
+        children = {pid for pid, ppid in parents.items() if ppid in tree} - tree
+        tree |= children
+        grew = bool(children)
+    return tree
+
+
+def find_processes(*needles: bytes) -> list[int]:
+    """PIDs whose command line contains every one of ``needles``."""
+    pids = []
+    for proc in Path("/proc").iterdir():
+        if not proc.name.isdigit():
+            continue
+        try:
+            cmdline = (proc / "cmdline").read_bytes().replace(b"\0", b" ")
+        except OSError:
+            continue
+        if all(needle in cmdline for needle in needles):
+            pids.append(int(proc.name))
+    return pids
+
+
+def rss_bytes(pids: set[int]) -> int:
+    """Total resident memory of ``pids``."""
+    total = 0
+    for pid in pids:
+        try:
+            for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1]) * 1024
+        except OSError:
+            continue
+    return total
+
+
+def cpu_seconds(pids: set[int]) -> float:
+    """User+system CPU of ``pids``, including their reaped children."""
+    ticks = 0
+    for pid in pids:
+        try:
+            # utime, stime, cutime, cstime
+            ticks += sum(int(value) for value in _stat_fields(pid)[11:15])
+        except (OSError, ValueError):
+            continue
+    return ticks / _CLK_TCK
@@ -0,0 +1,89 @@
+"""Benchmark screenshot encodings: bytes per frame and capture+encode time.
+
+Usage:
+    python -m bench.screenshot_encoding --url http://localhost:3000/kanban-board/1?mode=test
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import statistics
+import time
+
+from tools.encoding import ScreenshotEncoding, capture
+
+DISPLAY_WIDTH = int(os.environ.get("DISPLAY_WIDTH", "1920"))
+DISPLAY_HEIGHT = int(os.environ.get("DISPLAY_HEIGHT", "1080"))
+
+CASES = [
+    ("png", None),
+    ("jpeg", None),
+    ("png", (1024, 768)),
+    ("jpeg", (1024, 768)),
+]
+
+
+async def bench(url: str, frames: int, quality: int) -> list[dict]:
+    from playwright.async_api import async_playwright
+
+    results = []
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch(headless=True)
+        page = await browser.new_page(
+            viewport={"width": DISPLAY_WIDTH, "height": DISPLAY_HEIGHT}
+        )
+        await page.goto(url, wait_until="networkidle")
+
+        for fmt, size in CASES:
+            encoding = ScreenshotEncoding(
+                format=fmt,  # type: ignore[arg-type]
+                quality=quality,
+                width=size[0] if size else None,
+                height=size[1] if size else None,
+            )
+            await capture(page, encoding)  # warm-up
+            sizes, times = [], []
+            for _ in range(frames):
+                start = time.perf_counter()
+                data = await capture(page, encoding)
+                times.append((time.perf_counter() - start) * 1000)
+                sizes.append(len(base64.b64decode(data)))
+            results.append(
+                {
+                    "format": fmt,
+                    "size": f"{size[0]}x{size[1]}" if size else f"{DISPLAY_WIDTH}x{DISPLAY_HEIGHT}",
+                    "quality": quality if fmt != "png" else None,
+                    "bytes_per_frame": int(statistics.mean(sizes)),
+                    "encode_ms_p50": round(statistics.median(times), 2),
+                    "encode_ms_max": round(max(times), 2),
+                }
+            )
+        await browser.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=os.getenv("UI_CUBE_BASE_URL", "http://localhost:3000"))
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--quality", type=int, default=80)
+    parser.add_argument("--json", action="store_true", help="Print JSON lines only")
+    args = parser.parse_args()
+
+    results = asyncio.run(bench(args.url, args.frames, args.quality))
+    if args.json:
+        for row in results:
+            print(json.dumps(row))
+        return
+
+    print(f"{'format':<6} {'size':>10} {'bytes/frame':>12} {'p50 ms':>8} {'max ms':>8}")
+    for row in results:
+        print(
+            f"{row['format']:<6} {row['size']:>10} {row['bytes_per_frame']:>12} "
+            f"{row['encode_ms_p50']:>8} {row['encode_ms_max']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Compare page loads from the npm preview server vs. in-process static serving.
+
+Loads the same task URLs through both paths in fresh contexts and reports
+load latency, plus the memory each path costs: RSS of the preview server's
+process tree for ``npm``, and the in-memory asset bytes for ``inprocess``.
+The npm path needs the preview server running on UI_CUBE_BASE_URL.
+
+Usage:
+    python -m bench.static_serving --dist /app/uipath_enterprise_benchmark/DeterministicBenchmark/dist
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from bench.procs import find_processes, process_tree, rss_bytes
+from scenarios.deterministic import _localize_url
+from scenarios.task_store import get_task_store
+from tools.static_site import DEFAULT_DIR, StaticSite
+from tools.startup import _http_status
+
+
+def task_urls(limit: int) -> list[str]:
+    """One task URL per app family, up to ``limit``."""
+    store = get_task_store()
+    urls = []
+    for web_name in store.web_names():
+        ids = store.ids(web_name)
+        task = store.get(ids[0]) if ids else None
+        if task and task.get("web"):
+            urls.append(_localize_url(task["web"]))
+        if len(urls) >= limit:
+            break
+    return urls
+
+
+def node_rss_bytes() -> int:
+    """RSS of the preview server: ``npm run preview`` / ``vite preview`` and their children."""
+    roots = find_processes(b"npm", b"preview") + find_processes(b"vite", b"preview")
+    return rss_bytes(process_tree(roots))
+
+
+async def load_times(browser, urls: list[str], repeats: int, site: StaticSite | None) -> list[float]:
+    times = []
+    for _ in range(repeats):
+        for url in urls:
+            context = await browser.new_context()
+            if site:
+                await site.install(context)
+            page = await context.new_page()
+            start = time.perf_counter()
+            await page.goto(url, wait_until="load")
+            times.append((time.perf_counter() - start) * 1000)
+            await context.close()
+    return times
+
+
+async def bench(dist: str, limit: int, repeats: int) -> list[dict]:
+    from playwright.async_api import async_playwright
+
+    base_url = os.getenv("UI_CUBE_BASE_URL", "http://localhost:3000")
+    urls = task_urls(limit)
+    results = []
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch(headless=True)
+
+        if await _http_status(base_url) == 200:
+            times = await load_times(browser, urls, repeats, None)
+            results.append(_row("npm", times, node_rss_bytes()))
+        else:
+            results.append({"mode": "npm", "available": False})
+
+        site = StaticSite(dist, base_url)
+        site.load()
+        times = await load_times(browser, urls, repeats, site)
+        row = _row("inprocess", times, site.resident_bytes)
+        row["asset_load_ms"] = round(site.load_ms, 1)
+        row["misses"] = site.misses
+        results.append(row)
+
+        await browser.close()
+    return results
+
+
+def _row(mode: str, times: list[float], memory_bytes: int) -> dict:
+    return {
+        "mode": mode,
+        "available": True,
+        "loads": len(times),
+        "load_ms_p50": round(statistics.median(times), 1),
+        "load_ms_max": round(max(times), 1),
+        "memory_mb": round(memory_bytes / 1e6, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dist", default=os.environ.get("STATIC_SITE_DIR", DEFAULT_DIR))
+    parser.add_argument("--urls", type=int, default=10, help="Task URLs to load (one per family)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print JSON lines only")
+    args = parser.parse_args()
+
+    results = asyncio.run(bench(args.dist, args.urls, args.repeats))
+    if args.json:
+        for row in results:
+            print(json.dumps(row))
+        return
+
+    print(f"{'mode':<10} {'loads':>6} {'p50 ms':>8} {'max ms':>8} {'memory MB':>10}")
+    for row in results:
+        if not row["available"]:
+            print(f"{row['mode']:<10} unavailable (preview server not answering)")
+            continue
+        print(
+            f"{row['mode']:<10} {row['loads']:>6} {row['load_ms_p50']:>8} "
+            f"{row['load_ms_max']:>8} {row['memory_mb']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark text entry: per-key typing vs. single-event insertion (chars/sec).
+
+Usage:
+    python -m bench.write_paths --lengths 100 1000 5000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from tools.input import write_text
+
+FIXTURE = """
+<!doctype html>
+<input id="input" type="text" style="width: 90vw">
+<textarea id="textarea" rows="10" style="width: 90vw"></textarea>
+"""
+
+
+async def bench(lengths: list[int], repeats: int) -> list[dict]:
+    from playwright.async_api import async_playwright
+
+    results = []
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.set_content(FIXTURE)
+
+        for target in ("input", "textarea"):
+            for length in lengths:
+                text = ("lorem ipsum dolor sit amet " * (length // 27 + 1))[:length]
+                for mode in ("type", "insert", "auto"):
+                    times = []
+                    used = mode
+                    for _ in range(repeats):
+                        await page.fill(f"#{target}", "")
+                        await page.focus(f"#{target}")
+                        start = time.perf_counter()
+                        used = await write_text(page, text, mode)  # type: ignore[arg-type]
+                        times.append(time.perf_counter() - start)
+                        value = await page.input_value(f"#{target}")
+                        if value != text:
+                            raise RuntimeError(f"{mode} into {target} produced {len(value)} chars")
+                    best = min(times)
+                    results.append(
+                        {
+                            "target": target,
+                            "chars": length,
+                            "mode": mode,
+                            "path": used,
+                            "ms": round(best * 1000, 2),
+                            "chars_per_sec": round(length / best),
+                        }
+                    )
+        await browser.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[20, 200, 2000])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print JSON lines only")
+    args = parser.parse_args()
+
+    results = asyncio.run(bench(args.lengths, args.repeats))
+    if args.json:
+        for row in results:
+            print(json.dumps(row))
+        return
+
+    print(f"{'target':<9} {'chars':>6} {'mode':<7} {'path':<7} {'ms':>9} {'chars/s':>10}")
+    for row in results:
+        print(
+            f"{row['target']:<9} {row['chars']:>6} {row['mode']:<7} {row['path']:<7} "
+            f"{row['ms']:>9} {row['chars_per_sec']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,31 @@
 #!/bin/bash
 set -e
 
-# Start npm preview server (always needed for navigation tests)
-echo "[entrypoint] Starting npm preview server..." >&2
-cd /app/uipath_enterprise_benchmark/DeterministicBenchmark
-npm run preview -- --host 0.0.0.0 --port 3000 </dev/null >&2 &
-NPM_PID=$!
+# Start npm preview server unless the app is served in-process from memory
+if [ "${UI_CUBE_SERVE:-npm}" = "inprocess" ]; then
+    echo "[entrypoint] UI_CUBE_SERVE=inprocess - skipping npm preview server" >&2
+else
+    echo "[entrypoint] Starting npm preview server..." >&2
+    cd /app/uipath_enterprise_benchmark/DeterministicBenchmark
+    npm run preview -- --host 0.0.0.0 --port 3000 </dev/null >&2 &
+fi
 
-# Start display servers (Xvfb + x11vnc + noVNC) unless explicitly disabled
-if [ "${START_DISPLAY_SERVER:-1}" = "1" ]; then
+# Display servers (Xvfb + x11vnc + noVNC) are opt-in: the live view on
+# LIVE_VIEW_PORT streams headless Chromium. Set START_DISPLAY_SERVER=1 (and
+# PLAYWRIGHT_HEADLESS=0 to put the browser on it) for a full VNC desktop.
+if [ "${START_DISPLAY_SERVER:-0}" = "1" ]; then
     echo "[entrypoint] Starting display servers (Xvfb + x11vnc + noVNC)..." >&2
-    # Ensure Playwright renders to the X display when VNC is enabled
-    export PLAYWRIGHT_HEADLESS="0"
+    if [ "${PLAYWRIGHT_HEADLESS:-1}" != "0" ]; then
+        echo "[entrypoint] PLAYWRIGHT_HEADLESS is not 0 - the browser will not appear on the display" >&2
+    fi
     WIDTH="${DISPLAY_WIDTH:-1920}"
     HEIGHT="${DISPLAY_HEIGHT:-1080}"
     Xvfb :1 -screen 0 ${WIDTH}x${HEIGHT}x24 > /dev/null 2>&1 &
     export DISPLAY=:1
-    # Wait briefly for the X socket to appear before starting VNC
-    for i in $(seq 1 20); do
+    # x11vnc needs the X socket; poll for it instead of sleeping a fixed time
+    for i in $(seq 1 200); do
         [ -S /tmp/.X11-unix/X1 ] && break
-        sleep 0.2
+        sleep 0.02
     done
     # Start a lightweight desktop session if available (prevents black screen)
     if command -v xfce4-session >/dev/null 2>&1; then
@@ -33,20 +39,13 @@ if [ "${START_DISPLAY_SERVER:-1}" = "1" ]; then
     fi
     x11vnc -display :1 -nopw -listen 0.0.0.0 -forever -shared > /dev/null 2>&1 &
     /usr/share/novnc/utils/novnc_proxy --vnc localhost:5900 --listen 6080 > /dev/null 2>&1 &
-    sleep 1
 else
-    echo "[entrypoint] START_DISPLAY_SERVER=0 - skipping display servers" >&2
+    echo "[entrypoint] Skipping display servers (live view on port ${LIVE_VIEW_PORT:-8090})" >&2
 fi
 
-# Wait for npm server to be ready
-echo "[entrypoint] Waiting for preview server to start..." >&2
-sleep 3
-
-# Check if npm is still running
-if ! kill -0 $NPM_PID 2>/dev/null; then
-    echo "[entrypoint] ERROR: npm preview server failed to start" >&2
-    exit 1
-fi
+# No wait for the preview server here: initialize_environment probes it for
+# HTTP 200 while Chromium launches and fails startup if it never answers
+# (see tools/startup.py).
 
 echo "[entrypoint] Starting MCP server..." >&2
 exec python3 -u /app/env.py
@@ -3,9 +3,12 @@ import asyncio
 import logging
 import os
 import sys
+import time
 from datetime import datetime
 from typing import Any, TypedDict, cast
 
+_import_started = time.perf_counter()
+
 # CRITICAL: Register this module as 'env' so imports work correctly
 # even when running as __main__
 if __name__ == "__main__":
@@ -15,6 +18,9 @@ from hud import Environment
 from hud.tools.types import ContentResult
 from scenarios import register_scenarios
 from tools.browser import router as browser_router
+from tools.frames import frame_stats
+from tools.metrics import metrics
+from tools.startup import orchestrate_startup, timeline
 
 logging.basicConfig(
     stream=sys.stderr,
@@ -28,6 +34,13 @@ logger = logging.getLogger(__name__)
 # Global state
 playwright_tool = None
 browser_executor = None
+context_pool = None
+static_site = None
+asset_cache = None
+storage_reset = None
+episode_scheduler = None
+worker_pool = None
+live_view = None
 
 # Create Environment instance
 env = Environment(name="ui-cube")
@@ -37,34 +50,133 @@ class Telemetry(TypedDict):
     status: str
     timestamp: str
     live_url: str | None
+    frames: dict[str, int]
+    startup: dict[str, Any]
+    static_site: dict[str, Any] | None
+    asset_cache: dict[str, Any] | None
+    scheduler: dict[str, Any] | None
+    workers: dict[str, Any] | None
+    live_view: dict[str, Any] | None
+
+def _live_url() -> str | None:
+    """Where to watch episodes: the live view, or the app when it is off."""
+    if live_view:
+        return live_view.url
+    if worker_pool:
+        urls = [w.live_url for w in worker_pool.workers if w.live_url]
+        if urls:
+            return urls[0]
+    return os.getenv("UI_CUBE_BASE_URL")
+
+def _per_worker(replies: list[dict[str, Any]], key: str) -> dict[str, Any] | None:
+    stats = [{"worker": r["index"], **r[key]} for r in replies if r.get(key)]
+    return {"workers": stats} if stats else None
 
 @env.resource("telemetry://live")
 async def get_telemetry_resource() -> Telemetry:
+    if worker_pool:
+        # Browsers live in the worker processes; report theirs
+        replies = await worker_pool.telemetry()
+        return Telemetry(
+            provider="local",
+            status="running",
+            live_url=_live_url(),
+            timestamp=datetime.now().isoformat(),
+            frames={
+                key: sum(r["frames"].get(key, 0) for r in replies) for key in ("sent", "deduplicated")
+            },
+            startup=timeline.snapshot(),
+            static_site=_per_worker(replies, "static_site"),
+            asset_cache=_per_worker(replies, "asset_cache"),
+            scheduler=_per_worker(replies, "scheduler"),
+            workers=worker_pool.stats(),
+            live_view=_per_worker(replies, "live_view"),
+        )
     return Telemetry(
         provider="local",
         status="running" if playwright_tool else "not_initialized",
-        live_url=os.getenv("UI_CUBE_BASE_URL"),
+        live_url=_live_url(),
         timestamp=datetime.now().isoformat(),
+        frames=frame_stats(),
+        startup=timeline.snapshot(),
+        static_site=static_site.stats() if static_site else None,
+        asset_cache=asset_cache.stats() if asset_cache else None,
+        scheduler=episode_scheduler.stats() if episode_scheduler else None,
+        workers=None,
+        live_view=live_view.stats() if live_view else None,
     )
 
+@env.resource("metrics://latency")
+async def get_metrics_resource() -> dict[str, Any]:
+    """p50/p95/p99 latency (ms) per executor action, navigation and scenario phase."""
+    if worker_pool:
+        return (await worker_pool.metrics()).snapshot()
+    return metrics.snapshot()
+
+@env.resource("metrics://prometheus", mime_type="text/plain")
+async def get_metrics_prometheus() -> str:
+    """The same metrics in Prometheus text exposition format."""
+    if worker_pool:
+        return (await worker_pool.metrics()).to_prometheus()
+    return metrics.to_prometheus()
+
 @env.initialize
 async def initialize_environment() -> None:
     """Initialize the UI-CUBE environment."""
-    global playwright_tool, browser_executor
+    global playwright_tool, browser_executor, context_pool, static_site, asset_cache, storage_reset
+    global episode_scheduler, worker_pool, live_view
 
-    from hud.tools.executors.pyautogui import PyAutoGUIExecutor
-    from hud.tools.executors.xdo import XDOExecutor
     from tools.browser import PlaywrightTool, BrowserExecutor
     from tools.computer import register_computer_tools
+    from tools.context_pool import ContextPool
+    from tools.live_view import LiveView
+    from tools.scheduler import EpisodeScheduler
+    from tools.asset_cache import AssetCache
+    from tools.static_site import StaticSite
+    from tools.storage_reset import StorageReset
 
     try:
+        # BROWSER_WORKERS=N: browsers live in N worker processes, this one only serves MCP
+        from tools.workers import RemoteExecutor, WorkerPool
+
+        worker_pool = WorkerPool.from_env()
+        if worker_pool:
+            logger.info("Starting %d browser worker processes...", worker_pool.size)
+            await timeline.track("workers", worker_pool.start())
+            browser_executor = RemoteExecutor(worker_pool)
+            register_computer_tools(env, browser_executor)
+            logger.info("UI-CUBE environment ready with %d browser workers!", worker_pool.size)
+            return
+
         logger.info("Initializing local Playwright tool...")
         playwright_tool = PlaywrightTool(cdp_url=None)
-        logger.info("Playwright tool ready (browser launches lazily)")
+        context_pool = ContextPool(playwright_tool)
+        playwright_tool.pool = context_pool
+        episode_scheduler = EpisodeScheduler(context_pool)
+        logger.info(
+            "Playwright tool ready (context pool size %d, max %d concurrent episodes)",
+            context_pool.size,
+            episode_scheduler.max_concurrent,
+        )
+
+        # UI_CUBE_SERVE=inprocess: serve the app from memory instead of npm preview
+        static_site = await asyncio.to_thread(StaticSite.from_env)
+        if static_site:
+            playwright_tool.context_hooks.append(static_site.install)
+        else:
+            # Bundles fetched by one context are served to the others from memory
+            asset_cache = AssetCache.from_env()
+            if asset_cache:
+                playwright_tool.context_hooks.append(asset_cache.install)
+
+        # Restore a clean per-app storage snapshot before every episode
+        storage_reset = StorageReset.from_env(playwright_tool)
 
 
         executor_type = os.environ.get("COMPUTER_EXECUTOR", "playwright").lower()
         if executor_type == "xdo":
+            from hud.tools.executors.xdo import XDOExecutor
+
             if not XDOExecutor.is_available():
                 logger.warning(
                     "XDOExecutor unavailable; falling back to Playwright executor"
@@ -73,6 +185,8 @@ async def initialize_environment() -> None:
             else:
                 browser_executor = XDOExecutor()
         elif executor_type == "pyautogui":
+            from hud.tools.executors.pyautogui import PyAutoGUIExecutor
+
             if not PyAutoGUIExecutor.is_available():
                 logger.warning(
                     "PyAutoGUIExecutor unavailable; falling back to Playwright executor"
@@ -87,6 +201,23 @@ async def initialize_environment() -> None:
         register_computer_tools(env, browser_executor)
         logger.info("Tools registered")
 
+        # Launch and warm Chromium while the preview server comes up
+        await orchestrate_startup(
+            playwright_tool,
+            context_pool,
+            base_url="" if static_site else None,
+            require_preview=static_site is None,
+        )
+
+        # Headless-friendly live view; screencasts only while someone watches
+        live_view = LiveView.from_env(playwright_tool)
+        if live_view:
+            try:
+                await live_view.start()
+            except OSError as e:
+                logger.warning("Live view disabled: cannot listen on port %d: %s", live_view.port, e)
+                live_view = None
+
         initial_url = os.getenv("BROWSER_URL")
         if initial_url:
             await playwright_tool.navigate(initial_url)
@@ -125,18 +256,54 @@ async def tool_wait(seconds: float) -> ContentResult:
 
 @env.shutdown
 async def shutdown_environment() -> None:
-    global playwright_tool, browser_executor
+    global playwright_tool, browser_executor, context_pool, static_site, asset_cache, storage_reset
+    global episode_scheduler, worker_pool, live_view
 
     logger.info("Shutting down UI-CUBE environment...")
 
+    if live_view:
+        await live_view.close()
+    if worker_pool:
+        await worker_pool.close()
+    if context_pool:
+        await context_pool.close()
+
     playwright_tool = None
     browser_executor = None
+    context_pool = None
+    static_site = None
+    asset_cache = None
+    storage_reset = None
+    episode_scheduler = None
+    worker_pool = None
+    live_view = None
 
 
 env.include_router(browser_router)
 
 register_scenarios(env)
 
+_import_s = time.perf_counter() - _import_started
+metrics.observe("env.import", _import_s)
+_import_budget_ms = float(os.environ.get("IMPORT_BUDGET_MS", "0"))
+if _import_budget_ms and _import_s * 1000 > _import_budget_ms:
+    logger.warning(
+        "env.py import took %.0f ms (budget %.0f ms); see python -m bench.import_time",
+        _import_s * 1000,
+        _import_budget_ms,
+    )
+else:
+    logger.info("env.py imported in %.0f ms", _import_s * 1000)
+
 
 if __name__ == "__main__":
-    env.run(transport="stdio")
+    # MCP_TRANSPORT=http serves many concurrent sessions from one process
+    transport = os.environ.get("MCP_TRANSPORT", "stdio").lower()
+    if transport == "http":
+        env.run(
+            transport="http",
+            host=os.environ.get("MCP_HOST", "0.0.0.0"),
+            port=int(os.environ.get("MCP_PORT", "8765")),
+        )
+    else:
+        env.run(transport="stdio")
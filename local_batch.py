@@ -0,0 +1,146 @@
+"""Batch runner for the full UI-CUBE deterministic benchmark.
+
+Runs many tasks concurrently against a running environment (one MCP session
+per task, each backed by its own pooled browser context on the server; size
+the server's BROWSER_POOL_SIZE to --concurrency) and streams one JSON line
+per finished task to the results file. Re-running with the same results
+file resumes: tasks that already have a result are skipped.
+
+    python local_batch.py --concurrency 4 --family combo-box-tasks --out results.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+import hud
+from hud import Environment
+from hud.agents import create_agent
+from prompts import SYSTEM_PROMPT
+from scenarios.task_store import get_task_store
+
+logger = logging.getLogger(__name__)
+
+DEV_URL = os.getenv("HUD_DEV_URL", "http://localhost:8765/mcp")
+
+env = Environment("ui-cube")
+env.connect_url(DEV_URL)
+
+
+def select_tasks(families: list[str] | None, ids: list[str] | None) -> list[str]:
+    """Task IDs from the task store, filtered by web_name family and/or explicit ID."""
+    store = get_task_store()
+    if families:
+        selected = [t for family in families for t in store.ids(family)]
+    else:
+        selected = store.ids()
+    if ids:
+        selected = [t for t in selected if t in ids]
+    return selected
+
+
+def completed_ids(out: Path, retry_errors: bool) -> set[str]:
+    """IDs already recorded in a (possibly partial) results file."""
+    done: set[str] = set()
+    if not out.exists():
+        return done
+    for line in out.read_text().splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            # A crash can leave a truncated last line; that task is re-run
+            continue
+        if retry_errors and record.get("error"):
+            continue
+        done.add(record["task_id"])
+    return done
+
+
+async def run_task(task_id: str, model: str, max_steps: int) -> dict:
+    """Run one task with a fresh agent and return its result record."""
+    start = time.perf_counter()
+    record: dict = {"task_id": task_id, "model": model, "reward": 0.0, "steps": 0}
+    try:
+        task = env("deterministic", task_id=task_id)
+        async with hud.eval(task) as ctx:
+            agent = create_agent(
+                model=model,
+                system_prompt=SYSTEM_PROMPT,
+                disallowed_tools=["hud-logs", "gemnini_computer"],
+            )
+            trace = await agent.run(ctx, max_steps=max_steps)
+            record["steps"] = len(trace.trace)
+            record["messages"] = trace.num_messages
+        record["reward"] = ctx.reward or 0.0
+    except Exception as e:
+        logger.error("Task %s failed: %s", task_id, e)
+        record["error"] = str(e)
+    record["wall_s"] = round(time.perf_counter() - start, 2)
+    return record
+
+
+async def run_batch(
+    task_ids: list[str],
+    out: Path,
+    concurrency: int,
+    model: str,
+    max_steps: int,
+) -> list[dict]:
+    sem = asyncio.Semaphore(concurrency)
+    lock = asyncio.Lock()
+    results: list[dict] = []
+
+    with out.open("a") as fh:
+
+        async def worker(task_id: str) -> None:
+            async with sem:
+                record = await run_task(task_id, model, max_steps)
+            async with lock:
+                fh.write(json.dumps(record) + "\n")
+                fh.flush()
+                os.fsync(fh.fileno())
+                results.append(record)
+                print(
+                    f"[{len(results)}/{len(task_ids)}] {task_id}: "
+                    f"reward={record['reward']} steps={record['steps']} {record['wall_s']}s"
+                    + (f" error={record['error']}" if record.get("error") else "")
+                )
+
+        await asyncio.gather(*(worker(task_id) for task_id in task_ids))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run deterministic tasks in parallel")
+    parser.add_argument("--out", type=Path, default=Path("results.jsonl"))
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--family", action="append", help="web_name to include (repeatable)")
+    parser.add_argument("--task", action="append", help="Task ID to include (repeatable)")
+    parser.add_argument("--model", default="claude-sonnet-4-5")
+    parser.add_argument("--max-steps", type=int, default=30)
+    parser.add_argument("--retry-errors", action="store_true", help="Re-run tasks that errored")
+    args = parser.parse_args()
+
+    task_ids = select_tasks(args.family, args.task)
+    done = completed_ids(args.out, args.retry_errors)
+    pending = [t for t in task_ids if t not in done]
+    print("UI-CUBE Batch Run")
+    print("=" * 40)
+    print(f"{len(task_ids)} selected, {len(done & set(task_ids))} already done, {len(pending)} to run")
+
+    start = time.perf_counter()
+    results = asyncio.run(
+        run_batch(pending, args.out, args.concurrency, args.model, args.max_steps)
+    )
+    elapsed = time.perf_counter() - start
+    if results:
+        solved = sum(1 for r in results if r["reward"] == 1.0)
+        print(f"Solved {solved}/{len(results)} in {elapsed:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Model-free replay of deterministic tasks to benchmark the environment itself.
+
+Runs the ``deterministic`` scenario in-process and feeds scripted actions
+straight into the computer executor, so the numbers contain no model or MCP
+transport latency. Scripts come from recorded trajectories (TRAJECTORY_DIR,
+``*.jsonl.gz``) and/or a JSON file of hand-written scripts:
+
+    {"combo-box-tasks--1": {"reward": 1.0, "actions": [
+        {"action": "click", "args": {"x": 640, "y": 310}},
+        {"action": "write", "args": {"text": "Lisbon", "enter_after": true}}
+    ]}}
+
+Each episode's reward is checked against the expected one (the recorded
+reward, or ``reward`` in the script, default 1.0); the process exits non-zero
+on any mismatch so it can gate regressions.
+
+    python local_replay.py --trajectories trajectories --repeat 3 --json replay.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from tools.recorder import read_trajectory
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = {"screenshot", "click", "write", "press", "scroll", "move", "drag", "zoom"}
+
+
+def load_scripts(trajectories: Path | None, scripts: Path | None) -> dict[str, dict[str, Any]]:
+    """``{task_id: {"reward": float, "actions": [...]}}`` from both sources."""
+    loaded: dict[str, dict[str, Any]] = {}
+    if trajectories:
+        for path in sorted(trajectories.glob("*.jsonl.gz")):
+            episode = read_trajectory(path)
+            if not episode["task_id"] or episode["reward"] is None:
+                logger.warning("Skipping incomplete trajectory %s", path)
+                continue
+            # Latest recording of a task wins (file names sort by time)
+            loaded[episode["task_id"]] = {
+                "reward": episode["reward"],
+                "actions": [{"action": a["action"], "args": a["args"]} for a in episode["actions"]],
+            }
+    if scripts:
+        for task_id, script in json.loads(scripts.read_text()).items():
+            if isinstance(script, list):
+                script = {"actions": script}
+            loaded[task_id] = {"reward": script.get("reward", 1.0), "actions": script["actions"]}
+    return loaded
+
+
+async def replay_episode(env_module: Any, task_id: str, actions: list[dict]) -> dict[str, Any]:
+    """Run one scenario episode with ``actions`` and return its timings."""
+    from scenarios.deterministic import deterministic_scenario
+
+    executor = env_module.browser_executor
+    episode = deterministic_scenario(task_id)
+    start = time.perf_counter()
+    prompt = await episode.__anext__()
+    setup_s = time.perf_counter() - start
+    if not isinstance(prompt, str):
+        # Setup failed (unknown task, no browser) and yielded its reward
+        return {"task_id": task_id, "reward": prompt, "actions": 0, "action_errors": 0,
+                "setup_s": round(setup_s, 4), "action_s": 0.0, "wall_s": round(setup_s, 4)}
+
+    action_start = time.perf_counter()
+    errors = 0
+    for step in actions:
+        name, args = step["action"], step.get("args") or {}
+        if name == "wait":
+            await asyncio.sleep(args.get("ms", 0) / 1000)
+            continue
+        if name not in ACTIONS:
+            raise ValueError(f"Unknown action {name!r} in script for {task_id}")
+        result = await getattr(executor, name)(**args)
+        if getattr(result, "error", None):
+            errors += 1
+            logger.warning("%s step %s failed: %s", task_id, name, result.error)
+    action_s = time.perf_counter() - action_start
+
+    reward = await episode.__anext__()
+    await episode.aclose()
+    return {
+        "task_id": task_id,
+        "reward": reward,
+        "actions": len(actions),
+        "action_errors": errors,
+        "setup_s": round(setup_s, 4),
+        "action_s": round(action_s, 4),
+        "wall_s": round(time.perf_counter() - start, 4),
+    }
+
+
+async def run_replay(scripts: dict[str, dict[str, Any]], repeat: int) -> list[dict[str, Any]]:
+    import env as env_module
+    from tools.metrics import metrics
+
+    await env_module.initialize_environment()
+    metrics.reset()
+    results: list[dict[str, Any]] = []
+    try:
+        for run in range(repeat):
+            for task_id in sorted(scripts):
+                script = scripts[task_id]
+                record = await replay_episode(env_module, task_id, script["actions"])
+                record["run"] = run
+                record["expected"] = script["reward"]
+                record["match"] = record["reward"] == script["reward"]
+                results.append(record)
+                print(
+                    f"[run {run + 1}/{repeat}] {task_id}: reward={record['reward']} "
+                    f"expected={record['expected']} actions={record['actions']} {record['wall_s']}s"
+                    + ("" if record["match"] else "  MISMATCH")
+                )
+    finally:
+        tool = env_module.playwright_tool
+        await env_module.shutdown_environment()
+        if tool:
+            await tool.close()
+    return results
+
+
+def summarize(results: list[dict[str, Any]], elapsed: float) -> dict[str, Any]:
+    from tools.metrics import metrics
+
+    actions = sum(r["actions"] for r in results)
+    action_s = sum(r["action_s"] for r in results)
+    return {
+        "episodes": len(results),
+        "actions": actions,
+        "elapsed_s": round(elapsed, 3),
+        "episodes_per_min": round(len(results) / elapsed * 60, 2) if elapsed else 0.0,
+        "actions_per_sec": round(actions / action_s, 2) if action_s else 0.0,
+        "mismatches": [r["task_id"] for r in results if not r["match"]],
+        "latency_ms": metrics.snapshot()["latency_ms"],
+        "episodes_detail": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay scripted actions without a model")
+    parser.add_argument("--trajectories", type=Path, help="Directory of recorded *.jsonl.gz files")
+    parser.add_argument("--scripts", type=Path, help="JSON file of hand-written scripts per task ID")
+    parser.add_argument("--task", action="append", help="Only replay this task ID (repeatable)")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay every script this many times")
+    parser.add_argument("--record", action="store_true", help="Keep TRAJECTORY_DIR recording on")
+    parser.add_argument("--json", type=Path, help="Write the full report to this file")
+    args = parser.parse_args()
+
+    if not args.trajectories and not args.scripts:
+        parser.error("pass --trajectories and/or --scripts")
+    if not args.record:
+        # Replays would otherwise record copies of the trajectories they replay
+        os.environ.pop("TRAJECTORY_DIR", None)
+
+    scripts = load_scripts(args.trajectories, args.scripts)
+    if args.task:
+        scripts = {t: s for t, s in scripts.items() if t in args.task}
+    if not scripts:
+        print("No scripts to replay")
+        sys.exit(1)
+
+    print("UI-CUBE Replay")
+    print("=" * 40)
+    print(f"{len(scripts)} scripts x {args.repeat} runs")
+
+    start = time.perf_counter()
+    results = asyncio.run(run_replay(scripts, args.repeat))
+    report = summarize(results, time.perf_counter() - start)
+
+    print(
+        f"{report['episodes']} episodes in {report['elapsed_s']:.1f}s: "
+        f"{report['episodes_per_min']} episodes/min, {report['actions_per_sec']} actions/sec"
+    )
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+    if report["mismatches"]:
+        print(f"Reward mismatches: {', '.join(report['mismatches'])}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,101 +1,181 @@
 """Deterministic benchmark scenarios loaded from deterministic_bench.json."""
-import json
 import logging
 import os
-from pathlib import Path
+import time
 from typing import Any
 from urllib.parse import urlparse, urlunparse
 
+from scenarios.task_store import get_task_store
+from scenarios.verify import verify_page
+from setup.plan import run_setup_plan
+from tools.context_pool import session_key
+from tools.frames import reset_session
+from tools.metrics import metrics
+from tools.recorder import start_recording, stop_recording
+
 logger = logging.getLogger(__name__)
 
-# Local copy of the dataset (added under data/)
-TASKS_FILE = Path(__file__).parent.parent / "data" / "deterministic_bench.json"
 
-# Load all tasks once at module level
-try:
-    _ALL_TASKS = json.loads(TASKS_FILE.read_text())
-    _TASKS_BY_ID = {task["id"]: task for task in _ALL_TASKS if task.get("id")}
-    logger.info("Loaded %d deterministic tasks", len(_TASKS_BY_ID))
-except Exception as exc:
-    logger.error("Failed to load deterministic tasks from %s: %s", TASKS_FILE, exc)
-    _TASKS_BY_ID = {}
+def _localize_url(url: str) -> str:
+    base = os.getenv("UI_CUBE_BASE_URL", "http://localhost:3000")
+    if not url or not base:
+        return url
+    try:
+        src = urlparse(url)
+        dst = urlparse(base)
+        return urlunparse(
+            (dst.scheme or src.scheme, dst.netloc, src.path, src.params, src.query, src.fragment)
+        )
+    except Exception:
+        return url
 
 
-def register_deterministic_scenarios(env: Any) -> None:
-    """Register a single parameterized scenario for all deterministic tasks."""
-    
-    def _localize_url(url: str) -> str:
-        base = os.getenv("UI_CUBE_BASE_URL", "http://localhost:3000")
-        if not url or not base:
-            return url
+async def deterministic_scenario(task_id: str):
+    """Run a deterministic benchmark task by ID.
+
+    Args:
+        task_id: The task ID (e.g., 'combo-box-tasks--1')
+    """
+    import env as env_module
+
+    # BROWSER_WORKERS: the session's worker process runs the whole episode
+    workers = env_module.worker_pool
+    if workers:
+        session = session_key()
+        finished = False
         try:
-            src = urlparse(url)
-            dst = urlparse(base)
-            return urlunparse(
-                (dst.scheme or src.scheme, dst.netloc, src.path, src.params, src.query, src.fragment)
-            )
-        except Exception:
-            return url
-
-    @env.scenario("deterministic")
-    async def deterministic_scenario(task_id: str):
-        """Run a deterministic benchmark task by ID.
-        
-        Args:
-            task_id: The task ID (e.g., 'combo-box-tasks--1')
-        """
-        import env as env_module
-        
-        # Look up the task
-        task = _TASKS_BY_ID.get(task_id)
-        if not task:
-            logger.error("Task not found: %s", task_id)
-            logger.error("Available tasks: %s", list(_TASKS_BY_ID.keys())[:10])
-            yield 0.0
-            return
-
-        ques = task.get("ques", "")
-        ux_hint = task.get("ux_hint", "")
-        web_url = task.get("web", "")
-
-        # Localize the URL
-        if web_url:
-            web_url = _localize_url(web_url)
+            prompt = await workers.call("scenario_start", session, task_id=task_id)
+            if not isinstance(prompt, str):
+                finished = True
+                yield prompt
+                return
+            _ = yield prompt
+            finished = True
+            try:
+                reward = await workers.call("scenario_finish", session)
+            except Exception as exc:
+                logger.error("Episode %s lost on its browser worker: %s", task_id, exc)
+                reward = 0.0
+        finally:
+            if not finished:
+                # Abandoned after the prompt (or start failed): free the worker's context
+                try:
+                    await workers.call("scenario_abort", session)
+                except Exception as exc:
+                    logger.debug("Could not abort episode %s on its worker: %s", task_id, exc)
+            workers.unbind(session)
+        yield reward
+        return
+
+    # Look up the task
+    store = get_task_store()
+    task = store.get(task_id)
+    if not task:
+        logger.error("Task not found: %s", task_id)
+        logger.error("Available tasks: %s", store.ids()[:10])
+        yield 0.0
+        return
+
+    ques = task.get("ques", "")
+    ux_hint = task.get("ux_hint", "")
+    web_url = task.get("web", "")
+
+    # Localize the URL
+    if web_url:
+        web_url = _localize_url(web_url)
+
+    # Get the playwright tool
+    tool = env_module.playwright_tool
+    if not tool:
+        logger.warning("No playwright tool; cannot run task %s", task_id)
+        yield 0.0
+        return
+
+    setup_started = time.perf_counter()
 
-        # Get the playwright tool
-        tool = env_module.playwright_tool
-        if not tool:
-            logger.warning("No playwright tool; cannot run task %s", task_id)
-            yield 0.0
-            return
+    # Check out an isolated browser context for this episode (queueing behind
+    # other sessions if all are busy); tool.page and the computer executor
+    # resolve to it for the rest of the session.
+    scheduler = env_module.episode_scheduler
+    with metrics.timer("pool.acquire"):
+        lease = await scheduler.acquire() if scheduler else None
+    session = lease.session if lease else session_key()
+    reward = 0.0
+    setup_failed = False
+    # Everything from here holds the lease: release it and close the
+    # recording on setup errors and on episodes abandoned after the prompt
+    # (GeneratorExit at the yield), not only after verification.
+    try:
+        reset_session(session)
+        start_recording(task_id, session, web_url=web_url, prompt=ques)
+
+        # Start from the app family's clean storage snapshot
+        storage_reset = env_module.storage_reset
+        if storage_reset and web_url:
+            reset = await storage_reset.restore(task.get("web_name") or task_id, web_url)
+            if not reset["success"]:
+                logger.warning("Storage reset failed for %s: %s", task_id, reset["error"])
 
         # Navigate to the task URL BEFORE yielding prompt (so screenshots work)
         if web_url:
             logger.info("Navigating to task URL: %s", web_url)
             await tool.navigate(web_url)  # type: ignore[misc]
 
-        # Build and yield prompt
-        parts = [ques]
-        if ux_hint:
-            parts.append(f"\nHint: {ux_hint}")
-        if web_url:
-            parts.append(f"\nURL: {web_url}")
-        prompt = "\n".join([ques])
+        # Optional pre-conditioning, e.g. a half-filled form, in one batched plan
+        if task.get("setup"):
+            plan = await run_setup_plan(tool, task["setup"])
+            if not plan["success"]:
+                logger.error("Setup plan failed for %s: %s", task_id, plan["error"])
+                setup_failed = True
 
-        _ = yield prompt
+        # The task never reached its intended starting state: score 0 without
+        # prompting, like a missing task
+        if not setup_failed:
+            # Build and yield prompt
+            parts = [ques]
+            if ux_hint:
+                parts.append(f"\nHint: {ux_hint}")
+            if web_url:
+                parts.append(f"\nURL: {web_url}")
+            prompt = "\n".join([ques])
 
-        # ===== VERIFICATION PHASE =====
-        # Re-fetch tool in case state changed
-        tool = env_module.playwright_tool
-        
-        try:
-            if tool and tool.page:
-                html = await tool.page.content()  # type: ignore[union-attr]
-                success = ">code#1</" in html
-                yield 1.0 if success else 0.0
-            else:
-                logger.warning("No browser page available for verification")
-                yield 0.0
-        except Exception as exc:
-            logger.error("Verification failed for %s: %s", task_id, exc)
-            yield 0.0
+            metrics.observe("scenario.setup", time.perf_counter() - setup_started)
+            prompt_started = time.perf_counter()
+            _ = yield prompt
+            metrics.observe("scenario.prompt", time.perf_counter() - prompt_started)
+
+            # ===== VERIFICATION PHASE =====
+            # Re-fetch tool in case state changed
+            tool = env_module.playwright_tool
+
+            verify_started = time.perf_counter()
+            try:
+                if tool and tool.page:
+                    result = await verify_page(tool.page, task.get("verify"))
+                    logger.info(
+                        "Verified %s: success=%s in %.1f ms (in-page %.1f ms)",
+                        task_id,
+                        result.success,
+                        result.elapsed_ms,
+                        result.page_ms,
+                    )
+                    reward = 1.0 if result.success else 0.0
+                else:
+                    logger.warning("No browser page available for verification")
+            except Exception as exc:
+                logger.error("Verification failed for %s: %s", task_id, exc)
+            metrics.observe("scenario.verify", time.perf_counter() - verify_started)
+    finally:
+        # Hand the context back before the final yield: the generator is
+        # not guaranteed to be resumed after it.
+        if scheduler and lease:
+            with metrics.timer("pool.release"):
+                await scheduler.release(lease, session)
+        await stop_recording(session, reward=reward)
+
+    yield reward
+
+
+def register_deterministic_scenarios(env: Any) -> None:
+    """Register a single parameterized scenario for all deterministic tasks."""
+    env.scenario("deterministic")(deterministic_scenario)
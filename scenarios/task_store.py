@@ -0,0 +1,286 @@
+"""Lazy, indexed access to deterministic task definitions.
+
+Task files are never parsed as a whole at import. Each source file (the main
+``deterministic_bench.json`` plus any task packs) gets a compact sidecar
+index - byte offsets per task ID and the IDs belonging to each ``web_name`` -
+and a task is read from disk with a single seek when first requested.
+
+Packs are ``*.json`` (array of tasks) or ``*.jsonl`` files in
+``TASK_PACKS_DIR`` (default ``data/packs``). A pack task with the same ID as
+an earlier source overrides it. Sources are re-checked at most every
+``TASK_STORE_RELOAD_INTERVAL`` seconds, so packs can be added, edited or
+removed without restarting the environment.
+"""
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+TASKS_FILE = DATA_DIR / "deterministic_bench.json"
+
+_INDEX_VERSION = 1
+
+
+@dataclass
+class _SourceIndex:
+    path: Path
+    mtime_ns: int
+    size: int
+    offsets: dict[str, tuple[int, int]]
+    web_names: dict[str, list[str]] = field(default_factory=dict)
+
+
+def _scan_json_array(text: str) -> Iterator[tuple[dict[str, Any], int, int]]:
+    """Yield ``(task, start, end)`` character spans of a top-level JSON array."""
+    decoder = json.JSONDecoder()
+    pos = text.index("[") + 1
+    length = len(text)
+    while pos < length:
+        while pos < length and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= length or text[pos] == "]":
+            return
+        task, end = decoder.raw_decode(text, pos)
+        yield task, pos, end
+        pos = end
+
+
+def _scan_jsonl(text: str) -> Iterator[tuple[dict[str, Any], int, int]]:
+    pos = 0
+    for line in text.splitlines(keepends=True):
+        stripped = line.strip()
+        if stripped:
+            yield json.loads(stripped), pos, pos + len(line)
+        pos += len(line)
+
+
+def _build_index(path: Path, stat: os.stat_result) -> _SourceIndex:
+    text = path.read_text(encoding="utf-8")
+    scan = _scan_jsonl if path.suffix == ".jsonl" else _scan_json_array
+
+    offsets: dict[str, tuple[int, int]] = {}
+    web_names: dict[str, list[str]] = {}
+    # Character spans -> byte spans, encoding only the gaps between tasks
+    char_pos = byte_pos = 0
+    for task, start, end in scan(text):
+        byte_pos += len(text[char_pos:start].encode("utf-8"))
+        length = len(text[start:end].encode("utf-8"))
+        task_id = task.get("id")
+        if task_id:
+            offsets[task_id] = (byte_pos, length)
+            web_names.setdefault(task.get("web_name", ""), []).append(task_id)
+        byte_pos += length
+        char_pos = end
+
+    return _SourceIndex(path, stat.st_mtime_ns, stat.st_size, offsets, web_names)
+
+
+def _index_path(path: Path) -> Path:
+    index_dir = os.environ.get("TASK_INDEX_DIR")
+    base = Path(index_dir) if index_dir else path.parent
+    return base / f".{path.name}.idx"
+
+
+def _load_index(path: Path) -> _SourceIndex:
+    """Load the sidecar index for ``path``, rebuilding it if stale or missing."""
+    stat = path.stat()
+    idx_path = _index_path(path)
+    try:
+        raw = json.loads(idx_path.read_text())
+        if (
+            raw.get("version") == _INDEX_VERSION
+            and raw["mtime_ns"] == stat.st_mtime_ns
+            and raw["size"] == stat.st_size
+        ):
+            offsets = {k: (v[0], v[1]) for k, v in raw["offsets"].items()}
+            return _SourceIndex(path, stat.st_mtime_ns, stat.st_size, offsets, raw["web_names"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    start = time.perf_counter()
+    index = _build_index(path, stat)
+    logger.info(
+        "Indexed %d tasks in %s (%.0f ms)",
+        len(index.offsets),
+        path.name,
+        (time.perf_counter() - start) * 1000,
+    )
+    try:
+        tmp = idx_path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "version": _INDEX_VERSION,
+                    "mtime_ns": index.mtime_ns,
+                    "size": index.size,
+                    "offsets": index.offsets,
+                    "web_names": index.web_names,
+                },
+                separators=(",", ":"),
+            )
+        )
+        tmp.replace(idx_path)
+    except OSError as e:
+        logger.debug("Could not persist task index for %s: %s", path, e)
+    return index
+
+
+class TaskStore:
+    """On-demand task lookup by ID and by ``web_name`` across task sources."""
+
+    def __init__(
+        self,
+        main_file: Path = TASKS_FILE,
+        packs_dir: Path | None = None,
+        reload_interval: float | None = None,
+        cache_size: int = 256,
+    ) -> None:
+        self.main_file = main_file
+        packs = packs_dir or os.environ.get("TASK_PACKS_DIR") or DATA_DIR / "packs"
+        self.packs_dir = Path(packs)
+        self.reload_interval = (
+            reload_interval
+            if reload_interval is not None
+            else float(os.environ.get("TASK_STORE_RELOAD_INTERVAL", "2"))
+        )
+        self._cache_size = cache_size
+        self._cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._sources: dict[Path, _SourceIndex] = {}
+        self._owner: dict[str, Path] = {}
+        self._by_web_name: dict[str, list[str]] = {}
+        self._checked_at: float | None = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, task_id: str) -> dict[str, Any] | None:
+        """Return the task with ``task_id``, reading it from disk if needed."""
+        self._refresh()
+        cached = self._cache.get(task_id)
+        if cached is not None:
+            self._cache.move_to_end(task_id)
+            return cached
+
+        path = self._owner.get(task_id)
+        if path is None:
+            return None
+        offset, length = self._sources[path].offsets[task_id]
+        with path.open("rb") as fh:
+            fh.seek(offset)
+            task = json.loads(fh.read(length))
+
+        self._cache[task_id] = task
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return task
+
+    def ids(self, web_name: str | None = None) -> list[str]:
+        """All task IDs, or those of one ``web_name`` family, in source order."""
+        self._refresh()
+        if web_name is None:
+            return list(self._owner)
+        return list(self._by_web_name.get(web_name, []))
+
+    def web_names(self) -> list[str]:
+        self._refresh()
+        return list(self._by_web_name)
+
+    def reload(self) -> None:
+        """Re-check all sources now instead of waiting for the interval."""
+        self._checked_at = None
+        self._refresh()
+
+    def __contains__(self, task_id: object) -> bool:
+        self._refresh()
+        return task_id in self._owner
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._owner)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _source_files(self) -> list[Path]:
+        files = [self.main_file] if self.main_file.exists() else []
+        if self.packs_dir.is_dir():
+            files.extend(
+                sorted(p for p in self.packs_dir.iterdir() if p.suffix in (".json", ".jsonl"))
+            )
+        return files
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+
+        files = self._source_files()
+        changed = set(self._sources) != set(files)
+        for path in files:
+            try:
+                stat = path.stat()
+            except OSError:
+                changed = True
+                continue
+            current = self._sources.get(path)
+            if current and (current.mtime_ns, current.size) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            try:
+                self._sources[path] = _load_index(path)
+            except (OSError, ValueError) as e:
+                logger.error("Failed to index task source %s: %s", path, e)
+                self._sources.pop(path, None)
+            changed = True
+
+        if changed:
+            self._rebuild(files)
+
+    def _rebuild(self, files: list[Path]) -> None:
+        """Merge per-source indexes; later sources override earlier IDs."""
+        for stale in set(self._sources) - set(files):
+            del self._sources[stale]
+        owner: dict[str, Path] = {}
+        for path in files:
+            index = self._sources.get(path)
+            if index:
+                for task_id in index.offsets:
+                    owner[task_id] = path
+
+        by_web_name: dict[str, list[str]] = {}
+        for path in files:
+            index = self._sources.get(path)
+            if not index:
+                continue
+            for web_name, task_ids in index.web_names.items():
+                by_web_name.setdefault(web_name, []).extend(
+                    t for t in task_ids if owner.get(t) == path
+                )
+
+        self._owner = owner
+        self._by_web_name = by_web_name
+        self._cache.clear()
+        logger.info("Task store: %d tasks from %d sources", len(owner), len(files))
+
+
+_store: TaskStore | None = None
+
+
+def get_task_store() -> TaskStore:
+    """The process-wide task store (created on first use, indexes loaded lazily)."""
+    global _store
+    if _store is None:
+        _store = TaskStore()
+    return _store
+
+
+__all__ = ["TaskStore", "TASKS_FILE", "get_task_store"]
@@ -0,0 +1,122 @@
+"""In-page success checks for deterministic tasks.
+
+Each check runs as a single ``page.evaluate`` call and returns only a small
+result, so grading cost does not depend on how large the page's DOM is.
+
+A task may declare its own check under ``"verify"`` in
+``deterministic_bench.json``; tasks without one use :data:`DEFAULT_CHECK`,
+which matches the benchmark's success marker the same way the old
+``">code#1</" in page.content()`` test did: the run of adjacent text nodes
+that ends an element reads exactly ``code#1``. Runs are joined like the
+serializer joins them, so ``code#{n}`` rendered as two text nodes
+(``"code#"``, ``"1"``) still matches.
+
+Supported checks (a list of checks must all pass)::
+
+    {"kind": "text", "text": "code#1", "exact": true}
+    {"kind": "selector", "selector": "#result", "text": "Saved", "min_count": 1}
+    {"kind": "predicate", "script": "() => window.__state?.done === true"}
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECK: dict[str, Any] = {"kind": "text", "text": "code#1", "exact": True}
+
+_KINDS = ("text", "selector", "predicate")
+
+_VERIFY_JS = """
+async (checks) => {
+  const t0 = performance.now();
+  // Adjacent text nodes serialize as one string, so compare whole runs
+  const textProbe = (text, exact) => {
+    const walker = document.createTreeWalker(document.documentElement || document, NodeFilter.SHOW_TEXT);
+    for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+      const prev = node.previousSibling;
+      if (prev && prev.nodeType === Node.TEXT_NODE) continue;
+      let run = node.data;
+      let last = node;
+      while (last.nextSibling && last.nextSibling.nodeType === Node.TEXT_NODE) {
+        last = last.nextSibling;
+        run += last.data;
+      }
+      if (exact ? run === text && last.nextSibling === null : run.includes(text)) {
+        return true;
+      }
+    }
+    return false;
+  };
+  const run = async (check) => {
+    switch (check.kind) {
+      case "text":
+        return textProbe(check.text, check.exact !== false);
+      case "selector": {
+        const nodes = Array.from(document.querySelectorAll(check.selector));
+        const matches = check.text == null
+          ? nodes
+          : nodes.filter((n) => (n.textContent || "").includes(check.text));
+        return matches.length >= (check.min_count ?? 1);
+      }
+      case "predicate": {
+        const fn = (0, eval)(`(${check.script})`);
+        return Boolean(await fn());
+      }
+    }
+    return false;
+  };
+  const results = [];
+  for (const check of checks) {
+    results.push(await run(check));
+  }
+  return { results, elapsed_ms: performance.now() - t0 };
+}
+"""
+
+
+class VerifyError(ValueError):
+    """Raised when a task's ``verify`` declaration is malformed."""
+
+
+@dataclass
+class VerifyResult:
+    success: bool
+    elapsed_ms: float
+    page_ms: float = 0.0
+    results: list[bool] = field(default_factory=list)
+
+
+def normalize_checks(spec: Any) -> list[dict[str, Any]]:
+    """Validate a ``verify`` declaration and return it as a list of checks."""
+    if spec is None:
+        return [DEFAULT_CHECK]
+    checks = spec if isinstance(spec, list) else [spec]
+    if not checks:
+        raise VerifyError("verify declares no checks")
+    for check in checks:
+        if not isinstance(check, dict) or check.get("kind") not in _KINDS:
+            raise VerifyError(f"Unknown verify check: {check!r}")
+        required = {"text": "text", "selector": "selector", "predicate": "script"}[check["kind"]]
+        if not check.get(required):
+            raise VerifyError(f"verify check {check['kind']!r} requires {required!r}")
+    return checks
+
+
+async def verify_page(page: Any, spec: Any = None) -> VerifyResult:
+    """Evaluate ``spec`` inside ``page`` and return whether every check passed."""
+    checks = normalize_checks(spec)
+    start = time.perf_counter()
+    raw = await page.evaluate(_VERIFY_JS, checks)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    results = [bool(r) for r in raw.get("results", [])]
+    return VerifyResult(
+        success=bool(results) and all(results),
+        elapsed_ms=elapsed_ms,
+        page_ms=float(raw.get("elapsed_ms", 0.0)),
+        results=results,
+    )
+
+
+__all__ = ["DEFAULT_CHECK", "VerifyError", "VerifyResult", "normalize_checks", "verify_page"]
@@ -5,7 +5,9 @@ These are regular async functions that scenarios call in their setup phase.
 from setup.navigate import navigate_to_url
 from setup.cookies import set_cookies, clear_cookies
 from setup.interact import click_element, fill_input, select_option
+from setup.fixtures import get_fixture_store
 from setup.load_html import load_html_content
+from setup.plan import run_setup_plan, validate_plan
 
 __all__ = [
     "navigate_to_url",
@@ -15,4 +17,7 @@ __all__ = [
     "fill_input",
     "select_option",
     "load_html_content",
+    "get_fixture_store",
+    "run_setup_plan",
+    "validate_plan",
 ]
@@ -0,0 +1,151 @@
+"""Content-hashed HTML fixtures served through request routing.
+
+Fixtures are registered once under a hash of their content and served from
+``FIXTURE_ORIGIN`` (a host that never reaches the network) as
+``{origin}/{hash}/index.html`` plus any assets next to it. The same HTML
+always gets the same URL and is stored once, and pages of any size avoid
+data-URL parsing and length limits. Routed contexts bypass the browser HTTP
+cache, so every load is answered from this store. The least recently added
+fixtures are dropped beyond ``FIXTURE_CACHE_MB``; set ``FIXTURE_DIR`` to keep
+fixture bodies on disk instead of in memory.
+"""
+
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+import shutil
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_ORIGIN = os.environ.get("FIXTURE_ORIGIN", "http://fixtures.uicube.test").rstrip("/")
+
+Body = Union[str, bytes]
+
+
+def _to_bytes(body: Body) -> bytes:
+    return body.encode("utf-8") if isinstance(body, str) else body
+
+
+def _content_type(path: str) -> str:
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type in ("application/javascript", "application/json"):
+        content_type += "; charset=utf-8"
+    return content_type
+
+
+class FixtureStore:
+    """Fixture files keyed by ``/{hash}/{name}``, in memory or under a directory."""
+
+    def __init__(
+        self,
+        origin: str = FIXTURE_ORIGIN,
+        directory: Optional[str] = None,
+        max_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        self.origin = origin
+        self.directory = Path(directory) if directory else None
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._files: Dict[str, Union[bytes, Path]] = {}
+        # Fixture hash -> (file keys, total bytes), oldest first
+        self._fixtures: "OrderedDict[str, tuple[list[str], int]]" = OrderedDict()
+        self._contexts: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def add(self, html: Body, assets: Optional[Dict[str, Body]] = None) -> str:
+        """Register ``html`` (and assets it references relatively); return its URL."""
+        html_bytes = _to_bytes(html)
+        assets = {name.lstrip("/"): _to_bytes(body) for name, body in (assets or {}).items()}
+        digest = hashlib.blake2b(html_bytes, digest_size=16)
+        for name in sorted(assets):
+            digest.update(name.encode("utf-8"))
+            digest.update(assets[name])
+        key = digest.hexdigest()
+
+        prefix = f"/{key}/"
+        if key in self._fixtures:
+            self._fixtures.move_to_end(key)
+        else:
+            files = {"index.html": html_bytes, **assets}
+            for name, body in files.items():
+                self._files[prefix + name] = self._store(key, name, body)
+            total = sum(len(body) for body in files.values())
+            self._fixtures[key] = ([prefix + name for name in files], total)
+            self.size += total
+            self._evict()
+        return f"{self.origin}{prefix}index.html"
+
+    def _store(self, key: str, name: str, body: bytes) -> Union[bytes, Path]:
+        if self.directory is None:
+            return body
+        path = self.directory / key / name
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(body)
+        return path
+
+    def _evict(self) -> None:
+        # Never evict the fixture that was just added
+        while self.size > self.max_bytes and len(self._fixtures) > 1:
+            key, (names, total) = self._fixtures.popitem(last=False)
+            for name in names:
+                self._files.pop(name, None)
+            if self.directory is not None:
+                shutil.rmtree(self.directory / key, ignore_errors=True)
+            self.size -= total
+            self.evictions += 1
+
+    def get(self, url: str) -> Optional[bytes]:
+        entry = self._files.get(urlparse(url).path)
+        if entry is None:
+            return None
+        return entry.read_bytes() if isinstance(entry, Path) else entry
+
+    async def ensure_routed(self, context: Any) -> None:
+        """Route the fixture origin on ``context`` (once per context)."""
+        if context in self._contexts:
+            return
+        await context.route(f"{self.origin}/**", self._handle)
+        self._contexts.add(context)
+
+    async def _handle(self, route: Any) -> None:
+        path = urlparse(route.request.url).path
+        entry = self._files.get(path)
+        if isinstance(entry, Path):
+            try:
+                body: Optional[bytes] = await asyncio.to_thread(entry.read_bytes)
+            except OSError:
+                body = None
+        else:
+            body = entry
+        if body is None:
+            self.misses += 1
+            await route.fulfill(status=404, content_type="text/plain", body="Fixture not found")
+            return
+        self.hits += 1
+        await route.fulfill(status=200, headers={"content-type": _content_type(path)}, body=body)
+
+
+_store: Optional[FixtureStore] = None
+
+
+def get_fixture_store() -> FixtureStore:
+    global _store
+    if _store is None:
+        _store = FixtureStore(
+            directory=os.environ.get("FIXTURE_DIR") or None,
+            max_bytes=int(float(os.environ.get("FIXTURE_CACHE_MB", "64")) * 1024 * 1024),
+        )
+    return _store
+
+
+__all__ = ["FixtureStore", "get_fixture_store", "FIXTURE_ORIGIN"]
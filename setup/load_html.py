@@ -1,17 +1,27 @@
 """HTML content loading helper for remote browser environment."""
 
 import logging
-from typing import Any
+from typing import Any, Dict, Optional, Union
+
+from setup.fixtures import get_fixture_store
 
 logger = logging.getLogger(__name__)
 
 
-async def load_html_content(playwright_tool: Any, html: str) -> dict:
+async def load_html_content(
+    playwright_tool: Any,
+    html: str,
+    assets: Optional[Dict[str, Union[str, bytes]]] = None,
+) -> dict:
     """Load custom HTML content directly into the browser.
 
+    The HTML is registered as a content-hashed fixture and served through
+    request routing, so it may contain any characters and be megabytes long.
+
     Args:
         playwright_tool: The PlaywrightToolWithMemory instance
         html: HTML content to load
+        assets: Optional files the HTML references by relative path (name -> body)
 
     Returns:
         Result dict with success status
@@ -23,13 +33,16 @@ async def load_html_content(playwright_tool: Any, html: str) -> dict:
         return {"success": False, "error": "No browser page available"}
 
     try:
-        data_url = f"data:text/html,{html}"
-        await playwright_tool.page.goto(data_url)
+        page = playwright_tool.page
+        store = get_fixture_store()
+        url = store.add(html, assets)
+        await store.ensure_routed(page.context)
+        await page.goto(url)
         logger.info("Successfully loaded custom HTML content")
         return {
             "success": True,
             "length": len(html),
-            "url": playwright_tool.page.url,
+            "url": page.url,
         }
     except Exception as e:
         logger.error("Failed to load HTML content: %s", e)
@@ -0,0 +1,186 @@
+"""Declarative setup plans: many setup steps in as few browser round trips as possible."""
+
+import logging
+import time
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+STEP_FIELDS = {
+    "cookies": {"cookies"},
+    "navigate": {"url"},
+    "fill": {"selector", "text"},
+    "select": {"selector", "value"},
+    "click": {"selector"},
+    "storage": {"items"},
+}
+
+# Consecutive DOM steps run inside one page.evaluate. Each waits for its
+# element (up to timeout_ms) and the batch stops at the first failure.
+_RUN_DOM_STEPS_JS = """
+async ({steps, timeoutMs}) => {
+  const waitFor = (selector) => new Promise((resolve) => {
+    const found = document.querySelector(selector);
+    if (found) return resolve(found);
+    const timer = setTimeout(() => { observer.disconnect(); resolve(null); }, timeoutMs);
+    const observer = new MutationObserver(() => {
+      const el = document.querySelector(selector);
+      if (el) { clearTimeout(timer); observer.disconnect(); resolve(el); }
+    });
+    observer.observe(document.documentElement, {childList: true, subtree: true});
+  });
+  // Native setters so framework-controlled inputs see the change
+  const setValue = (el, value) => {
+    const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype
+      : el instanceof HTMLSelectElement ? HTMLSelectElement.prototype : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, "value").set.call(el, value);
+    el.dispatchEvent(new Event("input", {bubbles: true}));
+    el.dispatchEvent(new Event("change", {bubbles: true}));
+  };
+  const results = [];
+  for (const step of steps) {
+    const start = performance.now();
+    try {
+      if (step.kind === "storage") {
+        const area = step.area === "session" ? sessionStorage : localStorage;
+        for (const [k, v] of Object.entries(step.items)) area.setItem(k, String(v));
+      } else {
+        const el = await waitFor(step.selector);
+        if (!el) throw new Error(`No element matches ${step.selector}`);
+        if (step.kind === "fill") { el.focus(); setValue(el, step.text); }
+        else if (step.kind === "select") {
+          if (![...el.options].some(o => o.value === step.value)) {
+            throw new Error(`No option ${step.value} in ${step.selector}`);
+          }
+          setValue(el, step.value);
+        }
+        else if (step.kind === "click") { el.scrollIntoView({block: "center"}); el.click(); }
+      }
+      results.push({ok: true, ms: performance.now() - start});
+    } catch (e) {
+      results.push({ok: false, ms: performance.now() - start, error: String(e.message || e)});
+      break;
+    }
+  }
+  return results;
+}
+"""
+
+
+def validate_plan(steps: List[Dict[str, Any]]) -> List[str]:
+    """Return a list of problems with ``steps`` (empty when the plan is valid)."""
+    problems = []
+    for i, step in enumerate(steps):
+        kind = step.get("kind") if isinstance(step, dict) else None
+        if kind not in STEP_FIELDS:
+            problems.append(f"step {i}: unknown kind {kind!r}")
+            continue
+        missing = STEP_FIELDS[kind] - step.keys()
+        if missing:
+            problems.append(f"step {i} ({kind}): missing {', '.join(sorted(missing))}")
+        if kind == "storage" and step.get("area", "local") not in ("local", "session"):
+            problems.append(f"step {i} (storage): area must be 'local' or 'session'")
+    return problems
+
+
+def _group(kind: str) -> str:
+    return "dom" if kind in ("fill", "select", "click", "storage") else kind
+
+
+def _batches(steps: List[Dict[str, Any]]) -> List[List[tuple[int, Dict[str, Any]]]]:
+    """Group consecutive steps that can share one round trip."""
+    batches: List[List[tuple[int, Dict[str, Any]]]] = []
+    for i, step in enumerate(steps):
+        group = _group(step["kind"])
+        if batches and group != "navigate" and _group(batches[-1][0][1]["kind"]) == group:
+            batches[-1].append((i, step))
+        else:
+            batches.append([(i, step)])
+    return batches
+
+
+async def run_setup_plan(
+    playwright_tool: Any,
+    steps: List[Dict[str, Any]],
+    timeout: int = 5000,
+) -> dict:
+    """Validate and run a declarative list of setup steps.
+
+    Step kinds: ``cookies`` (cookies), ``navigate`` (url, optional
+    wait_for_load_state), ``fill`` (selector, text), ``select`` (selector,
+    value), ``click`` (selector) and ``storage`` (items, optional area
+    ``local``/``session``). Consecutive cookie steps share one call and
+    consecutive DOM steps share one ``page.evaluate``; execution stops at the
+    first failing step.
+
+    Args:
+        playwright_tool: The PlaywrightToolWithMemory instance
+        steps: Setup steps to run in order
+        timeout: Maximum time to wait for each element (ms)
+
+    Returns:
+        Result dict with success status, per-step timing and round trips used
+    """
+    problems = validate_plan(steps)
+    if problems:
+        logger.error("Invalid setup plan: %s", "; ".join(problems))
+        return {"success": False, "error": "; ".join(problems)}
+
+    if not playwright_tool or not hasattr(playwright_tool, "page") or not playwright_tool.page:
+        logger.error("No browser page available")
+        return {"success": False, "error": "No browser page available"}
+
+    logger.info("Running setup plan with %d steps", len(steps))
+    page = playwright_tool.page
+    timings: List[Dict[str, Any]] = []
+    round_trips = 0
+    start = time.perf_counter()
+
+    def fail(index: int, error: str) -> dict:
+        logger.error("Setup plan failed at step %d (%s): %s", index, steps[index]["kind"], error)
+        return {
+            "success": False,
+            "error": error,
+            "failed_step": index,
+            "steps": timings,
+            "round_trips": round_trips,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    for batch in _batches(steps):
+        first_index, first = batch[0]
+        batch_start = time.perf_counter()
+        round_trips += 1
+        try:
+            if first["kind"] == "navigate":
+                result = await playwright_tool.navigate(
+                    first["url"], first.get("wait_for_load_state", "load")
+                )
+                if not result.get("success", True):
+                    return fail(first_index, result.get("error") or "Navigation failed")
+            elif first["kind"] == "cookies":
+                await page.context.add_cookies([c for _, step in batch for c in step["cookies"]])
+        except Exception as e:
+            return fail(first_index, str(e))
+
+        if first["kind"] in ("navigate", "cookies"):
+            ms = (time.perf_counter() - batch_start) * 1000 / len(batch)
+            timings.extend({"index": i, "kind": s["kind"], "ok": True, "ms": round(ms, 1)} for i, s in batch)
+            continue
+
+        try:
+            results = await page.evaluate(
+                _RUN_DOM_STEPS_JS, {"steps": [s for _, s in batch], "timeoutMs": timeout}
+            )
+        except Exception as e:
+            return fail(first_index, str(e))
+        for (i, step), outcome in zip(batch, results):
+            timings.append({"index": i, "kind": step["kind"], "ok": outcome["ok"], "ms": round(outcome["ms"], 1)})
+            if not outcome["ok"]:
+                return fail(i, outcome["error"])
+
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+    logger.info(
+        "Setup plan finished: %d steps in %d round trips, %.0f ms", len(steps), round_trips, elapsed_ms
+    )
+    return {"success": True, "steps": timings, "round_trips": round_trips, "elapsed_ms": elapsed_ms}
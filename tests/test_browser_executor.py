@@ -0,0 +1,58 @@
+"""Regression checks for BrowserExecutor attributes."""
+import inspect
+
+import pytest
+
+pytest.importorskip("hud")
+
+from tools.browser import BrowserExecutor  # noqa: E402
+from tools.input import DragConfig  # noqa: E402
+
+
+def test_drag_is_still_a_method_after_init():
+    executor = BrowserExecutor(playwright_tool=None)  # type: ignore[arg-type]
+    assert inspect.iscoroutinefunction(executor.drag)
+    assert isinstance(executor.drag_config, DragConfig)
+
+
+def test_encoding_views_keep_drag():
+    executor = BrowserExecutor(playwright_tool=None)  # type: ignore[arg-type]
+    view = executor.with_encoding(executor.encoding)
+    assert inspect.iscoroutinefunction(view.drag)
+
+
+class _Mouse:
+    def __init__(self):
+        self.calls = []
+
+    async def click(self, x, y, button="left", click_count=1):
+        self.calls.append(click_count)
+
+
+class _Page:
+    viewport_size = None
+
+    def __init__(self):
+        self.mouse = _Mouse()
+
+    async def wait_for_timeout(self, ms):
+        pass
+
+
+async def _click(pattern):
+    executor = BrowserExecutor(playwright_tool=None)  # type: ignore[arg-type]
+    page = _Page()
+
+    async def ensure_page():
+        return page
+
+    executor._ensure_page = ensure_page  # type: ignore[method-assign]
+    await executor.click(x=10, y=10, pattern=pattern, take_screenshot=False)
+    return page.mouse.calls
+
+
+def test_double_click_pattern_is_one_multi_click():
+    import asyncio
+
+    assert asyncio.run(_click([100])) == [2]
+    assert asyncio.run(_click(None)) == [1]
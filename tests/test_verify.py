@@ -0,0 +1,45 @@
+"""In-page success checks against a real Chromium page."""
+import asyncio
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from scenarios.verify import verify_page  # noqa: E402
+
+# The marker split into two text nodes, as JSX like `code#{n}` renders it
+SPLIT_MARKER = """
+<div id="out"></div>
+<script>
+  const out = document.getElementById("out");
+  out.appendChild(document.createTextNode("code#"));
+  out.appendChild(document.createTextNode("1"));
+</script>
+"""
+
+
+async def _verify(html: str, spec=None):
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch(headless=True)
+        try:
+            page = await browser.new_page()
+            await page.set_content(html)
+            old_test = ">code#1</" in await page.content()
+            result = await verify_page(page, spec)
+        finally:
+            await browser.close()
+    return old_test, result.success
+
+
+def test_split_text_node_matches_like_page_content():
+    assert asyncio.run(_verify(SPLIT_MARKER)) == (True, True)
+
+
+def test_marker_followed_by_element_does_not_match():
+    assert asyncio.run(_verify("<div>code#1<span>x</span></div>")) == (False, False)
+
+
+def test_longer_text_run_does_not_match():
+    assert asyncio.run(_verify("<div>code#12</div>")) == (False, False)
@@ -1,5 +1,16 @@
 """Remote browser tools."""
 from tools.browser import router as browser_router, PlaywrightTool, BrowserExecutor
 from tools.computer import register_computer_tools
+from tools.context_pool import ContextPool
+from tools.encoding import ScreenshotEncoding
+from tools.macro import computer_batch
 
-__all__ = ["browser_router", "PlaywrightTool", "BrowserExecutor", "register_computer_tools"]
+__all__ = [
+    "browser_router",
+    "PlaywrightTool",
+    "BrowserExecutor",
+    "register_computer_tools",
+    "ContextPool",
+    "ScreenshotEncoding",
+    "computer_batch",
+]
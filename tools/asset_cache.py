@@ -0,0 +1,131 @@
+"""Content-addressed cache of static app assets shared by all browser contexts.
+
+Each new context has an empty HTTP cache, so every episode re-fetches the
+same JS/CSS bundles from the preview server. This cache intercepts static
+asset requests (by file extension) for ``UI_CUBE_BASE_URL`` on every context
+and answers repeats from memory. Bodies are stored once per content hash and
+evicted least-recently-used beyond ``ASSET_CACHE_MB``.
+"""
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+CACHEABLE_EXTENSIONS = frozenset(
+    {".js", ".mjs", ".css", ".woff", ".woff2", ".ttf", ".otf",
+     ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico"}
+)
+
+# Dropped from stored responses: the body is stored decoded and re-framed
+_HOP_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection"})
+
+
+@dataclass
+class _Entry:
+    body: bytes
+    headers: dict[str, str]
+    urls: set[str]
+
+
+class AssetCache:
+    """LRU, size-bounded, URL -> content-hash -> body cache for ``context.route``."""
+
+    def __init__(self, base_url: str, max_bytes: int) -> None:
+        parsed = urlparse(base_url)
+        self.origin = f"{parsed.scheme}://{parsed.netloc}"
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._by_url: dict[str, str] = {}
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "AssetCache | None":
+        """Cache bounded by ``ASSET_CACHE_MB`` (default 64; 0 disables)."""
+        max_mb = float(os.environ.get("ASSET_CACHE_MB", "64"))
+        if max_mb <= 0:
+            return None
+        return cls(os.getenv("UI_CUBE_BASE_URL", "http://localhost:3000"), int(max_mb * 1024 * 1024))
+
+    def cacheable(self, url: str) -> bool:
+        # Compare the parsed origin: a prefix match would also accept
+        # http://localhost:30001 or http://localhost:3000.evil.test
+        parsed = urlparse(url)
+        if f"{parsed.scheme}://{parsed.netloc}" != self.origin:
+            return False
+        return os.path.splitext(parsed.path)[1].lower() in CACHEABLE_EXTENSIONS
+
+    def get(self, url: str) -> _Entry | None:
+        digest = self._by_url.get(url)
+        if digest is None:
+            return None
+        self._entries.move_to_end(digest)
+        return self._entries[digest]
+
+    def put(self, url: str, body: bytes, headers: dict[str, str]) -> None:
+        if len(body) > self.max_bytes:
+            return
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        entry = self._entries.get(digest)
+        if entry is None:
+            kept = {k: v for k, v in headers.items() if k.lower() not in _HOP_HEADERS}
+            entry = self._entries[digest] = _Entry(body=body, headers=kept, urls=set())
+            self.size += len(body)
+        entry.urls.add(url)
+        self._by_url[url] = digest
+        self._entries.move_to_end(digest)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted.body)
+            self.evictions += 1
+            for old_url in evicted.urls:
+                self._by_url.pop(old_url, None)
+
+    async def install(self, context: Any) -> None:
+        await context.route(self.cacheable, self._handle)
+
+    async def _handle(self, route: Any) -> None:
+        request = route.request
+        if request.method != "GET":
+            await route.fallback()
+            return
+        entry = self.get(request.url)
+        if entry is not None:
+            self.hits += 1
+            await route.fulfill(status=200, headers=entry.headers, body=entry.body)
+            return
+
+        self.misses += 1
+        response = await route.fetch()
+        body = await response.body()
+        headers = response.headers
+        if response.status == 200 and "no-store" not in headers.get("cache-control", ""):
+            self.put(request.url, body, headers)
+        await route.fulfill(
+            status=response.status,
+            headers={k: v for k, v in headers.items() if k.lower() not in _HOP_HEADERS},
+            body=body,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+            "urls": len(self._by_url),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+__all__ = ["AssetCache", "CACHEABLE_EXTENSIONS"]
@@ -1,14 +1,27 @@
 """Browser tools - PlaywrightTool with headless support and BrowserExecutor."""
-import base64
+import copy
 import logging
 import os
-from typing import Literal, cast
+import time
+from dataclasses import replace
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Literal, cast
 
 from hud.server import MCPRouter
 from hud.tools.executors.base import BaseExecutor
 from hud.tools.playwright import PlaywrightTool as BasePlaywrightTool
 from hud.tools.types import ContentResult
 
+from tools.context_pool import session_key
+from tools.encoding import ScreenshotEncoding, capture
+from tools.frames import FrameCache
+from tools.input import DragConfig, WriteMode, default_write_mode, dispatch_drag, write_text
+from tools.metrics import metrics, timed
+from tools.recorder import recorded
+from tools.settle import SettleConfig, SettleResult, track_network, wait_for_settle
+
+if TYPE_CHECKING:
+    from tools.context_pool import ContextPool
+
 logger = logging.getLogger(__name__)
 
 router = MCPRouter()
@@ -16,6 +29,8 @@ router = MCPRouter()
 # Read display dimensions from environment (same as HUD SDK computer tools)
 DISPLAY_WIDTH = int(os.environ.get("DISPLAY_WIDTH", "1920"))
 DISPLAY_HEIGHT = int(os.environ.get("DISPLAY_HEIGHT", "1080"))
+# Delay between clicks above which they no longer count as one multi-click
+MULTI_CLICK_INTERVAL_MS = 500
 
 
 # =============================================================================
@@ -23,14 +38,62 @@ DISPLAY_HEIGHT = int(os.environ.get("DISPLAY_HEIGHT", "1080"))
 # =============================================================================
 
 
+def _context_options() -> dict[str, Any]:
+    """Options applied to every browser context the environment creates."""
+    return {
+        "viewport": {"width": DISPLAY_WIDTH, "height": DISPLAY_HEIGHT},
+        "ignore_https_errors": True,
+    }
+
+
 class PlaywrightTool(BasePlaywrightTool):
-    """PlaywrightTool that respects PLAYWRIGHT_HEADLESS environment variable."""
+    """PlaywrightTool that respects PLAYWRIGHT_HEADLESS environment variable.
+
+    When a :class:`~tools.context_pool.ContextPool` is attached, ``page``
+    resolves to the context checked out by the current MCP session, so each
+    episode drives its own isolated page on the shared browser.
+    """
+
+    def __init__(self, page: Any = None, cdp_url: str | None = None) -> None:
+        super().__init__(page=page, cdp_url=cdp_url)
+        self.pool: "ContextPool | None" = None
+        # Run on every context this tool creates or adopts (routing, caches, ...)
+        self.context_hooks: list[Callable[[Any], Awaitable[None]]] = []
+
+    async def prepare_context(self, context: Any) -> None:
+        for hook in self.context_hooks:
+            await hook(context)
+
+    @property
+    def page(self) -> Any:
+        if self.pool is not None:
+            lease = self.pool.lease_for(session_key())
+            if lease is not None:
+                return lease.page
+        return self.env
+
+    @page.setter
+    def page(self, value: Any) -> None:
+        self.env = value
+
+    @timed("playwright.navigate")
+    async def navigate(self, url: str, wait_for_load_state: Any = "networkidle") -> dict[str, Any]:
+        return await super().navigate(url, wait_for_load_state)
+
+    async def new_context(self) -> Any:
+        """Create a fresh, isolated context on the shared browser."""
+        await self._ensure_browser()
+        if self._browser is None:
+            raise RuntimeError("Browser failed to initialize")
+        context = await self._browser.new_context(**_context_options())
+        await self.prepare_context(context)
+        return context
 
     async def _ensure_browser(self) -> None:
         """Ensure browser is launched and ready, respecting PLAYWRIGHT_HEADLESS env var."""
         if self._browser is None or not self._browser.is_connected():
             # Check if we should use headless mode
-            headless_env = os.environ.get("PLAYWRIGHT_HEADLESS", "0")
+            headless_env = os.environ.get("PLAYWRIGHT_HEADLESS", "1")
             headless = headless_env.lower() in ("1", "true", "yes")
             
             if self._cdp_url:
@@ -42,6 +105,7 @@ class PlaywrightTool(BasePlaywrightTool):
             if not self._cdp_url and not headless:
                 os.environ["DISPLAY"] = os.environ.get("DISPLAY", ":1")
 
+            launch_started = time.perf_counter()
             if self._playwright is None:
                 try:
                     from playwright.async_api import async_playwright
@@ -68,8 +132,7 @@ class PlaywrightTool(BasePlaywrightTool):
                         self.page = existing_pages[0]
                 else:
                     self._browser_context = await self._browser.new_context(
-                        viewport={"width": DISPLAY_WIDTH, "height": DISPLAY_HEIGHT},
-                        ignore_https_errors=True,
+                        **_context_options()
                     )
             else:
                 # Launch local browser with headless setting from env var
@@ -100,13 +163,11 @@ class PlaywrightTool(BasePlaywrightTool):
                 if self._browser is None:
                     raise RuntimeError("Browser failed to initialize")
 
-                self._browser_context = await self._browser.new_context(
-                    viewport={"width": DISPLAY_WIDTH, "height": DISPLAY_HEIGHT},
-                    ignore_https_errors=True,
-                )
+                self._browser_context = await self._browser.new_context(**_context_options())
 
             if self._browser_context is None:
                 raise RuntimeError("Browser context failed to initialize")
+            await self.prepare_context(self._browser_context)
 
             # Reuse existing page if available, otherwise create new one
             pages = self._browser_context.pages
@@ -116,6 +177,7 @@ class PlaywrightTool(BasePlaywrightTool):
             else:
                 self.page = await self._browser_context.new_page()
                 logger.info("Created new browser page")
+            metrics.observe("browser.launch", time.perf_counter() - launch_started)
             logger.info("Playwright browser launched successfully")
 
 
@@ -137,30 +199,128 @@ PLAYWRIGHT_KEY_MAP = {
 
 
 class BrowserExecutor(BaseExecutor):
-    """Executor that performs actions within a browser viewport using Playwright."""
+    """Executor that performs actions within a browser viewport using Playwright.
+
+    Screenshots are encoded according to ``encoding``. Each computer tool
+    variant gets its own view via :meth:`with_encoding`, so e.g. the OpenAI
+    tool can receive 1024x768 JPEGs while Anthropic gets PNGs at its size.
+    """
 
-    def __init__(self, playwright_tool: PlaywrightTool, display_num: int | None = None):
+    def __init__(
+        self,
+        playwright_tool: PlaywrightTool,
+        display_num: int | None = None,
+        encoding: ScreenshotEncoding | None = None,
+    ):
         super().__init__(display_num)
         self.playwright_tool = playwright_tool
+        self.encoding = encoding or ScreenshotEncoding.from_env()
+        self.frames = FrameCache()
+        self.settle = SettleConfig.from_env()
+        self.write_mode: WriteMode = default_write_mode()
+        self.drag_config = DragConfig.from_env()
+
+    def with_encoding(
+        self, encoding: ScreenshotEncoding, dedup: bool | None = None
+    ) -> "BrowserExecutor":
+        """Return a view of this executor that emits frames with ``encoding``.
+
+        ``dedup`` turns "screen unchanged" notes on or off for the view
+        (default: ``FRAME_DEDUP``).
+        """
+        view = copy.copy(self)
+        view.encoding = encoding
+        view.frames = FrameCache(dedup)
+        return view
 
     def _map_key(self, key: str) -> str:
         return PLAYWRIGHT_KEY_MAP.get(key.lower().strip(), key)
 
+    def _to_viewport(self, page, x: int, y: int) -> tuple[int, int]:
+        """Map display-space coordinates onto the page's real viewport.
+
+        The computer tools already scale model coordinates from the frame size
+        they advertise to DISPLAY_WIDTH x DISPLAY_HEIGHT; this covers pages whose
+        viewport differs from that (e.g. a reused context over CDP).
+        """
+        viewport = page.viewport_size
+        if not viewport or (viewport["width"], viewport["height"]) == (DISPLAY_WIDTH, DISPLAY_HEIGHT):
+            return x, y
+        return (
+            round(x * viewport["width"] / DISPLAY_WIDTH),
+            round(y * viewport["height"] / DISPLAY_HEIGHT),
+        )
+
     async def _ensure_page(self):
         await self.playwright_tool._ensure_browser()
-        if not self.playwright_tool.page:
+        page = self.playwright_tool.page
+        if not page:
             raise RuntimeError("No browser page available")
-        return self.playwright_tool.page
+        if self.settle.enabled:
+            # Count requests from before the action so its own fetches are seen
+            track_network(page)
+        return page
+
+    async def wait_settled(self, config: SettleConfig | None = None) -> SettleResult:
+        """Wait for the UI to go quiet now, regardless of whether settle mode is on."""
+        page = await self._ensure_page()
+        return await wait_for_settle(page, config or replace(self.settle, enabled=True))
+
+    async def _settle(self) -> str:
+        """Wait for the UI to go quiet if settle mode is on; return a note."""
+        if not self.settle.enabled:
+            return ""
+        try:
+            page = await self._ensure_page()
+            result = await wait_for_settle(page, self.settle)
+            metrics.observe("executor.settle", result.waited_ms / 1000)
+            logger.debug("Settle: %s", result)
+            return "\n" + result.describe()
+        except Exception as e:
+            logger.warning("Settle wait failed: %s", e)
+            return ""
 
-    async def screenshot(self) -> str | None:
+    async def _capture(self) -> str | None:
         try:
             page = await self._ensure_page()
-            screenshot_bytes = await page.screenshot(full_page=False)
-            return base64.b64encode(screenshot_bytes).decode()
+            with metrics.timer(f"frame.capture.{self.encoding.format}"):
+                data = await capture(page, self.encoding)
+            metrics.observe_bytes(f"frame.{self.encoding.format}", len(data) * 3 // 4)
+            return data
         except Exception as e:
             logger.error("Screenshot failed: %s", e)
             return None
 
+    @timed("executor.screenshot")
+    @recorded("screenshot")
+    async def screenshot(self) -> str | None:
+        session = session_key()
+        self.frames.next_step(session)
+        data = await self._capture()
+        if data:
+            self.frames.observe(session, data)
+        return data
+
+    async def _frame_result(self) -> ContentResult:
+        """Post-action frame, or a short note if the screen did not change.
+
+        The model already has the identical frame from an earlier step, so
+        only a reference to that step is sent instead of a new image.
+        """
+        note = await self._settle()
+        session = session_key()
+        self.frames.next_step(session)
+        data = await self._capture()
+        if not data:
+            return ContentResult(output=note or None, base64_image=data)
+        seen_at = self.frames.check(session, data)
+        if seen_at is not None:
+            unchanged = f"Screen unchanged since step {seen_at}; no new screenshot."
+            return ContentResult(output=f"{note}\n{unchanged}" if note else unchanged)
+        return ContentResult(output=note or None, base64_image=data)
+
+    @timed("executor.click")
+    @recorded("click")
     async def click(
         self,
         x: int | None = None,
@@ -174,6 +334,7 @@ class BrowserExecutor(BaseExecutor):
             page = await self._ensure_page()
             if x is None or y is None:
                 return ContentResult(error="Coordinates required for click")
+            x, y = self._to_viewport(page, x, y)
 
             if hold_keys:
                 for key in hold_keys:
@@ -181,11 +342,16 @@ class BrowserExecutor(BaseExecutor):
 
             button_map = {"left": "left", "right": "right", "middle": "middle", "back": "left", "forward": "left"}
             click_button = cast(Literal["left", "right", "middle"], button_map[button])
-            if pattern:
+            if pattern and max(pattern) <= MULTI_CLICK_INTERVAL_MS:
+                # pattern holds the delays between len(pattern) + 1 clicks; one
+                # multi-click raises clickCount so dblclick/selection events fire
+                await page.mouse.click(x, y, button=click_button, click_count=len(pattern) + 1)
+            elif pattern:
+                # Too slow to count as a multi-click: separate single clicks
+                await page.mouse.click(x, y, button=click_button)
                 for delay in pattern:
+                    await page.wait_for_timeout(delay)
                     await page.mouse.click(x, y, button=click_button)
-                    if delay > 0:
-                        await page.wait_for_timeout(delay)
             else:
                 await page.mouse.click(x, y, button=click_button)
 
@@ -195,17 +361,20 @@ class BrowserExecutor(BaseExecutor):
 
             result = ContentResult(output=f"Clicked at ({x}, {y})")
             if take_screenshot:
-                result = result + ContentResult(base64_image=await self.screenshot())
+                result = result + await self._frame_result()
             return result
         except Exception as e:
             return ContentResult(error=str(e))
 
+    @timed("executor.write")
+    @recorded("write")
     async def write(
         self,
         text: str,
         enter_after: bool = False,
         hold_keys: list[str] | None = None,
         take_screenshot: bool = True,
+        mode: WriteMode | None = None,
     ) -> ContentResult:
         try:
             page = await self._ensure_page()
@@ -214,7 +383,10 @@ class BrowserExecutor(BaseExecutor):
                 for key in hold_keys:
                     await page.keyboard.down(self._map_key(key))
 
-            await page.keyboard.type(text)
+            # Held modifiers only reach the page through real key events
+            mode = "type" if hold_keys else (mode or self.write_mode)
+            used = await write_text(page, text, mode)
+            logger.debug("Wrote %d chars via %s", len(text), used)
             if enter_after:
                 await page.keyboard.press("Enter")
 
@@ -224,11 +396,13 @@ class BrowserExecutor(BaseExecutor):
 
             result = ContentResult(output=f"Typed: {text}")
             if take_screenshot:
-                result = result + ContentResult(base64_image=await self.screenshot())
+                result = result + await self._frame_result()
             return result
         except Exception as e:
             return ContentResult(error=str(e))
 
+    @timed("executor.press")
+    @recorded("press")
     async def press(
         self,
         keys: list[str],
@@ -243,11 +417,13 @@ class BrowserExecutor(BaseExecutor):
 
             result = ContentResult(output=f"Pressed: {key_combination}")
             if take_screenshot:
-                result = result + ContentResult(base64_image=await self.screenshot())
+                result = result + await self._frame_result()
             return result
         except Exception as e:
             return ContentResult(error=str(e))
 
+    @timed("executor.scroll")
+    @recorded("scroll")
     async def scroll(
         self,
         x: int | None = None,
@@ -264,17 +440,21 @@ class BrowserExecutor(BaseExecutor):
                 viewport = page.viewport_size
                 x = viewport["width"] // 2 if viewport else 400
                 y = viewport["height"] // 2 if viewport else 300
+            else:
+                x, y = self._to_viewport(page, x, y)
 
             await page.mouse.move(x, y)
             await page.mouse.wheel(scroll_x or 0, scroll_y or 0)
 
             result = ContentResult(output=f"Scrolled by ({scroll_x}, {scroll_y})")
             if take_screenshot:
-                result = result + ContentResult(base64_image=await self.screenshot())
+                result = result + await self._frame_result()
             return result
         except Exception as e:
             return ContentResult(error=str(e))
 
+    @timed("executor.move")
+    @recorded("move")
     async def move(
         self,
         x: int | None = None,
@@ -285,16 +465,19 @@ class BrowserExecutor(BaseExecutor):
             page = await self._ensure_page()
             if x is None or y is None:
                 return ContentResult(error="Coordinates required for move")
+            x, y = self._to_viewport(page, x, y)
 
             await page.mouse.move(x, y)
 
             result = ContentResult(output=f"Moved to ({x}, {y})")
             if take_screenshot:
-                result = result + ContentResult(base64_image=await self.screenshot())
+                result = result + await self._frame_result()
             return result
         except Exception as e:
             return ContentResult(error=str(e))
 
+    @timed("executor.drag")
+    @recorded("drag")
     async def drag(
         self,
         path: list[tuple[int, int]],
@@ -306,19 +489,14 @@ class BrowserExecutor(BaseExecutor):
             page = await self._ensure_page()
             if not path or len(path) < 2:
                 return ContentResult(error="Path must have at least 2 points")
+            path = [self._to_viewport(page, px, py) for px, py in path]
 
             if hold_keys:
                 for key in hold_keys:
                     await page.keyboard.down(self._map_key(key))
 
-            start_x, start_y = path[0]
-            await page.mouse.move(start_x, start_y)
-            await page.mouse.down(button=button)
-
-            for x, y in path[1:]:
-                await page.mouse.move(x, y)
-
-            await page.mouse.up(button=button)
+            modifiers = [self._map_key(key) for key in hold_keys or []]
+            await dispatch_drag(page, path, button, modifiers, self.drag_config)
 
             if hold_keys:
                 for key in hold_keys:
@@ -326,11 +504,13 @@ class BrowserExecutor(BaseExecutor):
 
             result = ContentResult(output=f"Dragged through {len(path)} points")
             if take_screenshot:
-                result = result + ContentResult(base64_image=await self.screenshot())
+                result = result + await self._frame_result()
             return result
         except Exception as e:
             return ContentResult(error=str(e))
 
+    @timed("executor.zoom")
+    @recorded("zoom")
     async def zoom(
         self,
         x0: int,
@@ -340,21 +520,34 @@ class BrowserExecutor(BaseExecutor):
         target_width: int | None = None,
         target_height: int | None = None,
     ) -> ContentResult:
-        try:
-            from io import BytesIO
+        """Capture only the requested region, rendered at the zoom factor.
 
-            from PIL import Image
-
-            screenshot_base64 = await self.screenshot()
-            if not screenshot_base64:
-                return ContentResult(error="Failed to take screenshot for zoom")
-
-            image_data = base64.b64decode(screenshot_base64)
-            image = Image.open(BytesIO(image_data))
-
-            zoomed_base64 = self._crop_and_resize_image(
-                image, x0, y0, x1, y1, target_width, target_height
+        The browser rasterises the clip at ``scale`` directly, so no full
+        frame is captured, decoded or cropped on the event loop.
+        """
+        try:
+            page = await self._ensure_page()
+            x0, y0 = self._to_viewport(page, x0, y0)
+            x1, y1 = self._to_viewport(page, x1, y1)
+            viewport = page.viewport_size or {"width": DISPLAY_WIDTH, "height": DISPLAY_HEIGHT}
+            x0, x1 = sorted((max(0, min(x0, viewport["width"])), max(0, min(x1, viewport["width"]))))
+            y0, y1 = sorted((max(0, min(y0, viewport["height"])), max(0, min(y1, viewport["height"]))))
+            width, height = x1 - x0, y1 - y0
+            if width <= 0 or height <= 0:
+                return ContentResult(error="Zoom region is empty")
+
+            scale = 1.0
+            if target_width and target_height:
+                scale = min(target_width / width, target_height / height)
+
+            # Zoomed frames stay lossless; they exist to read fine detail.
+            zoomed_base64 = await capture(
+                page,
+                ScreenshotEncoding(),
+                clip={"x": x0, "y": y0, "width": width, "height": height},
+                scale=scale,
             )
+            metrics.observe_bytes("frame.zoom", len(zoomed_base64) * 3 // 4)
             return ContentResult(base64_image=zoomed_base64)
         except Exception as e:
             logger.error("Failed to capture zoom region: %s", e)
@@ -0,0 +1,25 @@
+"""Shared Chrome DevTools Protocol sessions for pages."""
+import logging
+import weakref
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# One CDP session per page, created on first use and dropped with the page
+_sessions: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+
+
+async def cdp_session(page: Any) -> Any:
+    """Return a cached CDP session for ``page``, or ``None`` when not Chromium."""
+    if page in _sessions:
+        return _sessions[page]
+    session = None
+    try:
+        session = await page.context.new_cdp_session(page)
+    except Exception as e:
+        logger.debug("CDP unavailable for page (%s); using Playwright APIs", e)
+    _sessions[page] = session
+    return session
+
+
+__all__ = ["cdp_session"]
@@ -1,31 +1,79 @@
 """Computer tools registration."""
+import logging
+import os
 from typing import Any
 
-from hud.tools.computer import (
-    AnthropicComputerTool,
-    OpenAIComputerTool,
-    HudComputerTool,
-    GeminiComputerTool,
-    QwenComputerTool,
-)
+import hud.tools.computer as computer_tools
 from tools.browser import router
+from tools.encoding import ScreenshotEncoding
+from tools.frames import dedup_enabled
+from tools.macro import set_macro_executor
+
+logger = logging.getLogger(__name__)
+
+# Tool class per variant, keyed by its env var prefix (ANTHROPIC_COMPUTER_WIDTH, ...).
+# hud.tools.computer imports each class on first access, so variants that are
+# not selected with COMPUTER_TOOLS are never imported.
+VARIANTS = {
+    "ANTHROPIC": "AnthropicComputerTool",
+    "OPENAI": "OpenAIComputerTool",
+    "GEMINI": "GeminiComputerTool",
+    "HUD": "HudComputerTool",
+    "QWEN": "QwenComputerTool",
+}
+
+
+def _selected_variants() -> list[str]:
+    selected = os.environ.get("COMPUTER_TOOLS", "anthropic,openai,gemini")
+    prefixes = []
+    for name in selected.split(","):
+        prefix = name.strip().upper()
+        if not prefix:
+            continue
+        if prefix not in VARIANTS:
+            logger.warning("Unknown computer tool variant %r in COMPUTER_TOOLS", name)
+            continue
+        prefixes.append(prefix)
+    return prefixes
+
 
 # Create tool instances at module level with None executor
-# The executor will be set during initialization
-_tools = [
-    AnthropicComputerTool(executor=None),
-    OpenAIComputerTool(executor=None),
-    # HudComputerTool(executor=None),
-    GeminiComputerTool(executor=None),
-    # QwenComputerTool(executor=None),
-]
+# The executor will be set during initialization.
+_tools = {
+    prefix: getattr(computer_tools, VARIANTS[prefix])(executor=None)
+    for prefix in _selected_variants()
+}
 
 # Register tools on the browser router at module level
-for tool in _tools:
+for tool in _tools.values():
     router.add_tool(tool)
 
 
 def register_computer_tools(env: Any, executor: Any) -> None:
-    """Set the executor for all computer tools."""
-    for tool in _tools:
-        tool.executor = executor
+    """Set the executor for all computer tools.
+
+    Executors that support per-variant encoding (``with_encoding``) get one
+    view per tool, so each tool's frames match the size it advertises. The
+    ``computer_batch`` tool uses the executor as-is (full-size frames).
+    """
+    set_macro_executor(executor)
+    for prefix, tool in _tools.items():
+        if not hasattr(executor, "with_encoding"):
+            tool.executor = executor
+            continue
+
+        encoding = ScreenshotEncoding.from_env(prefix, tool.width, tool.height)
+        dedup = dedup_enabled(prefix)
+        tool.executor = executor.with_encoding(encoding, dedup=dedup)
+        if encoding.width and tool.rescale_images:
+            # Frames already arrive at exactly the tool's width x height; skip
+            # the re-encode. Coordinates are still scaled per axis by the tool.
+            tool.rescale_images = False
+        logger.info(
+            "%s computer tool frames: %s q=%d size=%s dedup=%s",
+            prefix.lower(),
+            encoding.format,
+            encoding.quality,
+            f"{encoding.width}x{encoding.height}" if encoding.width else "viewport",
+            dedup,
+        )
@@ -0,0 +1,225 @@
+"""Pool of pre-warmed, isolated browser contexts sharing one Chromium instance."""
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Literal
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION = "default"
+
+ResetPolicy = Literal["reset", "recycle"]
+
+# Set by browser workers, which serve sessions of the front end's MCP server
+_bound_session: ContextVar[str | None] = ContextVar("bound_session", default=None)
+
+
+def session_key() -> str:
+    """Return the MCP session ID of the current request, or ``"default"``.
+
+    Tool calls, scenario setup and scenario evaluation all run inside an MCP
+    request, so the session ID is the one key they share for an episode.
+    """
+    bound = _bound_session.get()
+    if bound:
+        return bound
+    try:
+        from fastmcp.server.dependencies import get_context
+
+        sid = get_context().session_id
+        return sid or DEFAULT_SESSION
+    except Exception:
+        return DEFAULT_SESSION
+
+
+@contextmanager
+def bound_session(session: str) -> Iterator[None]:
+    """Make :func:`session_key` return ``session`` in the current task."""
+    token = _bound_session.set(session)
+    try:
+        yield
+    finally:
+        _bound_session.reset(token)
+
+
+@dataclass
+class PooledContext:
+    """A browser context checked out of the pool, with its single page."""
+
+    index: int
+    context: Any
+    page: Any
+    uses: int = 0
+    session: str | None = None
+    acquired_at: float = field(default=0.0)
+
+
+class ContextPool:
+    """Keeps N isolated ``BrowserContext``s warm on the PlaywrightTool's browser.
+
+    Contexts are created with the viewport already applied and parked on
+    ``about:blank``. A scenario checks one out for the current MCP session and
+    hands it back when grading is done. On release the context is either reset
+    in place (cookies, storage and extra pages cleared) or, once it has served
+    ``max_uses`` episodes or the policy is ``"recycle"``, closed and replaced
+    with a fresh one.
+    """
+
+    def __init__(
+        self,
+        playwright_tool: Any,
+        size: int | None = None,
+        max_uses: int | None = None,
+        policy: ResetPolicy | None = None,
+    ) -> None:
+        self.playwright_tool = playwright_tool
+        self.size = max(1, size or int(os.environ.get("BROWSER_POOL_SIZE", "1")))
+        self.max_uses = max_uses or int(os.environ.get("BROWSER_POOL_MAX_USES", "20"))
+        self.policy: ResetPolicy = _cast_policy(
+            policy or os.environ.get("BROWSER_POOL_RESET", "reset")
+        )
+        self._idle: asyncio.Queue[PooledContext] = asyncio.Queue()
+        self._leases: dict[str, PooledContext] = {}
+        self._warm_lock = asyncio.Lock()
+        self._warmed = False
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def warm(self) -> None:
+        """Create all pooled contexts up front (idempotent)."""
+        async with self._warm_lock:
+            if self._warmed:
+                return
+            start = time.perf_counter()
+            contexts = await asyncio.gather(*(self._create(i) for i in range(self.size)))
+            for pooled in contexts:
+                self._idle.put_nowait(pooled)
+            self._warmed = True
+            logger.info(
+                "Warmed %d browser contexts in %.0f ms",
+                self.size,
+                (time.perf_counter() - start) * 1000,
+            )
+
+    async def close(self) -> None:
+        """Close every context owned by the pool."""
+        pooled: list[PooledContext] = list(self._leases.values())
+        while not self._idle.empty():
+            pooled.append(self._idle.get_nowait())
+        self._leases.clear()
+        for item in pooled:
+            await self._dispose(item)
+        self._warmed = False
+
+    # ------------------------------------------------------------------
+    # Checkout / return
+    # ------------------------------------------------------------------
+
+    def lease_for(self, session: str | None = None) -> PooledContext | None:
+        """Return the context currently checked out by ``session``, if any."""
+        return self._leases.get(session or session_key())
+
+    async def acquire(self, session: str | None = None) -> PooledContext:
+        """Check out a context for ``session``, waiting if all are busy.
+
+        A session that still holds a lease (e.g. an episode abandoned before
+        grading) gets its old context reset and handed back to the pool first.
+        """
+        session = session or session_key()
+        stale = self._leases.get(session)
+        if stale is not None:
+            logger.warning("Session %s re-acquired without release; resetting", session)
+            await self.release(stale)
+
+        await self.warm()
+        pooled = await self._idle.get()
+        if pooled.page.is_closed() or not self._is_alive(pooled):
+            pooled = await self._replace(pooled)
+
+        pooled.uses += 1
+        pooled.session = session
+        pooled.acquired_at = time.monotonic()
+        self._leases[session] = pooled
+        logger.info(
+            "Context %d checked out by session %s (use %d)", pooled.index, session, pooled.uses
+        )
+        return pooled
+
+    async def release(self, pooled: PooledContext) -> None:
+        """Return ``pooled`` to the pool, resetting or recycling it first."""
+        if pooled.session is not None and self._leases.get(pooled.session) is pooled:
+            del self._leases[pooled.session]
+        pooled.session = None
+
+        try:
+            if self.policy == "recycle" or pooled.uses >= self.max_uses:
+                pooled = await self._replace(pooled)
+            else:
+                await self._reset(pooled)
+        except Exception as e:
+            logger.warning("Reset of context %d failed (%s); recycling", pooled.index, e)
+            pooled = await self._replace(pooled)
+
+        self._idle.put_nowait(pooled)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "leased": len(self._leases),
+            "policy": self.policy,
+            "max_uses": self.max_uses,
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    async def _create(self, index: int) -> PooledContext:
+        context = await self.playwright_tool.new_context()
+        page = await context.new_page()
+        await page.goto("about:blank")
+        return PooledContext(index=index, context=context, page=page)
+
+    async def _replace(self, pooled: PooledContext) -> PooledContext:
+        await self._dispose(pooled)
+        return await self._create(pooled.index)
+
+    async def _dispose(self, pooled: PooledContext) -> None:
+        try:
+            await pooled.context.close()
+        except Exception as e:
+            logger.debug("Closing context %d failed: %s", pooled.index, e)
+
+    async def _reset(self, pooled: PooledContext) -> None:
+        """Clear cookies, web storage and stray pages without closing the context."""
+        context, page = pooled.context, pooled.page
+        for extra in list(context.pages):
+            if extra is not page:
+                await extra.close()
+        await context.clear_cookies()
+        if page.url.startswith(("http://", "https://")):
+            await page.evaluate("() => { localStorage.clear(); sessionStorage.clear(); }")
+        await page.goto("about:blank")
+
+    @staticmethod
+    def _is_alive(pooled: PooledContext) -> bool:
+        browser = pooled.context.browser
+        return browser is None or browser.is_connected()
+
+
+def _cast_policy(value: str) -> ResetPolicy:
+    value = value.lower().strip()
+    if value not in ("reset", "recycle"):
+        logger.warning("Unknown BROWSER_POOL_RESET=%r; using 'reset'", value)
+        return "reset"
+    return value  # type: ignore[return-value]
+
+
+__all__ = ["ContextPool", "PooledContext", "bound_session", "session_key"]
@@ -0,0 +1,210 @@
+"""Screenshot encoding: format, quality and downscale applied at capture time."""
+import asyncio
+import base64
+import logging
+import os
+from dataclasses import dataclass, replace
+from io import BytesIO
+from typing import Any, Literal
+
+from tools.cdp import cdp_session
+
+logger = logging.getLogger(__name__)
+
+# hud's ContentResult labels images by sniffing for JPEG/PNG only, so other
+# formats (e.g. WebP) would reach the model mislabelled as image/png.
+ImageFormat = Literal["png", "jpeg"]
+
+_FORMATS: tuple[str, ...] = ("png", "jpeg")
+
+@dataclass(frozen=True)
+class ScreenshotEncoding:
+    """How frames are encoded before they leave the executor.
+
+    ``width``/``height`` are the exact frame size the model sees, scaled per
+    axis like the computer tools scale coordinates; ``None`` keeps the
+    viewport resolution.
+    """
+
+    format: ImageFormat = "png"
+    quality: int = 80
+    width: int | None = None
+    height: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.format not in _FORMATS:
+            raise ValueError(f"Unsupported frame format {self.format!r}; use png or jpeg")
+
+    @property
+    def lossy(self) -> bool:
+        return self.format != "png"
+
+    def size_for(self, viewport_width: int, viewport_height: int) -> tuple[int, int] | None:
+        """Exact frame size for this viewport, or ``None`` to keep it as is."""
+        if not self.width or not self.height:
+            return None
+        if (self.width, self.height) == (viewport_width, viewport_height):
+            return None
+        return self.width, self.height
+
+    def scale_for(self, viewport_width: int, viewport_height: int) -> float:
+        """Uniform factor for the browser-side capture (never upscales).
+
+        Covers the larger of the two axis factors; when the frame's aspect
+        ratio differs from the viewport's, the other axis is resized after.
+        """
+        size = self.size_for(viewport_width, viewport_height)
+        if size is None:
+            return 1.0
+        return min(1.0, max(size[0] / viewport_width, size[1] / viewport_height))
+
+    def with_size(self, width: int | None, height: int | None) -> "ScreenshotEncoding":
+        return replace(self, width=width, height=height)
+
+    @classmethod
+    def from_env(
+        cls,
+        prefix: str | None = None,
+        width: int | None = None,
+        height: int | None = None,
+    ) -> "ScreenshotEncoding":
+        """Build the encoding for a tool variant from environment variables.
+
+        ``FRAME_FORMAT``/``FRAME_QUALITY``/``FRAME_DOWNSCALE`` set the
+        environment-wide default and ``{PREFIX}_FRAME_*`` (e.g.
+        ``OPENAI_FRAME_FORMAT``) overrides it for one variant. With
+        downscale enabled, frames are emitted at ``width``x``height`` - the
+        variant's ``{PREFIX}_COMPUTER_WIDTH``/``_HEIGHT`` - so the computer
+        tool's own coordinate scaling maps clicks back onto the viewport.
+        """
+
+        def _get(name: str, default: str) -> str:
+            if prefix:
+                value = os.environ.get(f"{prefix}_FRAME_{name}")
+                if value:
+                    return value
+            return os.environ.get(f"FRAME_{name}", default)
+
+        fmt = _get("FORMAT", "png").lower().strip()
+        if fmt == "jpg":
+            fmt = "jpeg"
+        if fmt == "webp":
+            logger.warning("WebP frames cannot be labelled over MCP; using jpeg for %s", prefix)
+            fmt = "jpeg"
+        elif fmt not in _FORMATS:
+            logger.warning("Unknown screenshot format %r; using png", fmt)
+            fmt = "png"
+
+        quality = max(1, min(100, int(_get("QUALITY", "80"))))
+        downscale = _get("DOWNSCALE", "0").lower() in ("1", "true", "yes")
+        return cls(
+            format=fmt,  # type: ignore[arg-type]
+            quality=quality,
+            width=width if downscale else None,
+            height=height if downscale else None,
+        )
+
+
+async def capture(
+    page: Any,
+    encoding: ScreenshotEncoding,
+    clip: dict[str, float] | None = None,
+    scale: float | None = None,
+) -> str:
+    """Capture the viewport (or ``clip``) of ``page`` and return base64 data.
+
+    On Chromium the capture goes through ``Page.captureScreenshot`` so the
+    browser encodes and downscales natively and hands back base64 directly.
+    Elsewhere it falls back to ``page.screenshot`` plus PIL in a worker thread.
+    Frames whose aspect ratio differs from the viewport are resized per axis
+    with PIL after capture. ``scale`` overrides the encoding's size with a
+    uniform factor (used by zoom). Without a fixed viewport (``no_viewport``
+    contexts) the encoding's size is not applied and frames keep the window's
+    own resolution.
+    """
+    viewport = page.viewport_size
+    size = None
+    if scale is None and viewport is None:
+        scale = 1.0
+    elif scale is None:
+        size = encoding.size_for(viewport["width"], viewport["height"])
+        scale = encoding.scale_for(viewport["width"], viewport["height"])
+        if size is not None and size == (
+            round(viewport["width"] * scale),
+            round(viewport["height"] * scale),
+        ):
+            size = None  # the uniform browser-side scale already lands on it
+
+    cdp = await cdp_session(page)
+    if cdp is not None:
+        params: dict[str, Any] = {
+            "format": encoding.format,
+            "captureBeyondViewport": False,
+            "fromSurface": True,
+        }
+        if encoding.lossy:
+            params["quality"] = encoding.quality
+        if clip is not None or scale != 1.0:
+            # CDP clips are in document coordinates; shift by the scroll offset
+            metrics = await cdp.send("Page.getLayoutMetrics")
+            visual = metrics["cssVisualViewport"]
+            region = clip or {
+                "x": 0,
+                "y": 0,
+                **(viewport or {"width": visual["clientWidth"], "height": visual["clientHeight"]}),
+            }
+            params["clip"] = {
+                "x": region["x"] + visual["pageX"],
+                "y": region["y"] + visual["pageY"],
+                "width": region["width"],
+                "height": region["height"],
+                "scale": scale,
+            }
+        result = await cdp.send("Page.captureScreenshot", params)
+        if size is None:
+            return result["data"]
+        raw = base64.b64decode(result["data"])
+        data = await asyncio.to_thread(transcode, raw, encoding, size=size)
+        return base64.b64encode(data).decode()
+
+    if scale != 1.0 or size is not None:
+        raw = await page.screenshot(full_page=False, clip=clip)
+        data = await asyncio.to_thread(transcode, raw, encoding, scale, size)
+    else:
+        kwargs: dict[str, Any] = {"type": encoding.format}
+        if encoding.lossy:
+            kwargs["quality"] = encoding.quality
+        data = await page.screenshot(full_page=False, clip=clip, **kwargs)
+    return base64.b64encode(data).decode()
+
+
+def transcode(
+    raw: bytes,
+    encoding: ScreenshotEncoding,
+    scale: float = 1.0,
+    size: tuple[int, int] | None = None,
+) -> bytes:
+    """Re-encode a capture with PIL (blocking; run it off the event loop).
+
+    ``size`` resizes to exactly that width and height; otherwise ``scale``
+    resizes uniformly.
+    """
+    from PIL import Image
+
+    image = Image.open(BytesIO(raw))
+    if size is None and scale != 1.0:
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    if size is not None and size != image.size:
+        image = image.resize(size, Image.Resampling.LANCZOS)
+    if encoding.format == "jpeg" and image.mode != "RGB":
+        image = image.convert("RGB")
+
+    buffer = BytesIO()
+    if encoding.lossy:
+        image.save(buffer, format=encoding.format.upper(), quality=encoding.quality)
+    else:
+        image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+__all__ = ["ScreenshotEncoding", "capture", "transcode"]
@@ -0,0 +1,101 @@
+"""Frame-change detection so identical post-action screenshots are not re-sent.
+
+Off unless ``FRAME_DEDUP=1`` (or ``{PREFIX}_FRAME_DEDUP`` for one computer
+tool variant). Variants whose agents expect an image on every computer call
+never deduplicate.
+"""
+import hashlib
+import logging
+import os
+import weakref
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+_caches: "weakref.WeakSet[FrameCache]" = weakref.WeakSet()
+
+# OpenAI and Gemini computer use require a screenshot in every call output
+_NEEDS_EVERY_FRAME = frozenset({"OPENAI", "GEMINI"})
+
+
+def dedup_enabled(prefix: str | None = None) -> bool:
+    """Whether the ``prefix`` tool variant may get "screen unchanged" notes."""
+    if prefix and prefix.upper() in _NEEDS_EVERY_FRAME:
+        return False
+    value = os.environ.get(f"{prefix}_FRAME_DEDUP") if prefix else None
+    if not value:
+        value = os.environ.get("FRAME_DEDUP", "0")
+    return value.lower() in ("1", "true", "yes")
+
+
+@dataclass
+class _SessionFrames:
+    step: int = 0
+    last_digest: bytes | None = None
+    last_step: int = 0
+
+
+class FrameCache:
+    """Remembers the last frame each session was shown, by content hash.
+
+    Steps count executor actions per session. ``observe`` records a frame the
+    model is definitely seeing (explicit screenshots); ``check`` is used for
+    post-action frames and reports whether the frame matches the last one shown.
+    """
+
+    def __init__(self, enabled: bool | None = None) -> None:
+        if enabled is None:
+            enabled = dedup_enabled()
+        self.enabled = enabled
+        self.deduplicated = 0
+        self.sent = 0
+        self._sessions: dict[str, _SessionFrames] = {}
+        _caches.add(self)
+
+    def next_step(self, session: str) -> int:
+        frames = self._sessions.setdefault(session, _SessionFrames())
+        frames.step += 1
+        return frames.step
+
+    def observe(self, session: str, data: str) -> None:
+        frames = self._sessions.setdefault(session, _SessionFrames())
+        frames.last_digest = _digest(data)
+        frames.last_step = frames.step
+        self.sent += 1
+
+    def check(self, session: str, data: str) -> int | None:
+        """Return the step the frame was last shown at if unchanged, else record it."""
+        frames = self._sessions.setdefault(session, _SessionFrames())
+        digest = _digest(data)
+        if self.enabled and digest == frames.last_digest:
+            self.deduplicated += 1
+            return frames.last_step
+        frames.last_digest = digest
+        frames.last_step = frames.step
+        self.sent += 1
+        return None
+
+    def reset(self, session: str) -> None:
+        self._sessions.pop(session, None)
+
+
+def _digest(data: str) -> bytes:
+    return hashlib.blake2b(data.encode("ascii"), digest_size=16).digest()
+
+
+def reset_session(session: str) -> None:
+    """Forget what ``session`` has seen in every cache (new episode)."""
+    for cache in list(_caches):
+        cache.reset(session)
+
+
+def frame_stats() -> dict[str, int]:
+    """Frames sent vs. deduplicated, summed over all executor views."""
+    caches = list(_caches)
+    return {
+        "sent": sum(c.sent for c in caches),
+        "deduplicated": sum(c.deduplicated for c in caches),
+    }
+
+
+__all__ = ["FrameCache", "dedup_enabled", "reset_session", "frame_stats"]
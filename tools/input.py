@@ -0,0 +1,213 @@
+"""Low-level input helpers for BrowserExecutor."""
+import asyncio
+import logging
+import math
+import os
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from tools.cdp import cdp_session
+
+logger = logging.getLogger(__name__)
+
+WriteMode = Literal["auto", "insert", "type"]
+
+INSERT_MIN_CHARS = int(os.environ.get("WRITE_INSERT_MIN_CHARS", "16"))
+
+# Whether the focused element looks like it accepts a whole string as one
+# input event: a text-like <input>, a <textarea> or a contenteditable, with no
+# inline key handlers and not acting as a combobox/autocomplete. Listeners
+# added with addEventListener (React, Vue, ...) are invisible to this probe.
+_INSERTABLE_JS = """
+() => {
+  let el = document.activeElement;
+  while (el && el.shadowRoot && el.shadowRoot.activeElement) el = el.shadowRoot.activeElement;
+  if (!el || el.disabled || el.readOnly) return false;
+  const textTypes = ["text", "search", "email", "url", "tel", "password", ""];
+  const editable =
+    (el.tagName === "INPUT" && textTypes.includes((el.getAttribute("type") || "").toLowerCase())) ||
+    el.tagName === "TEXTAREA" ||
+    el.isContentEditable;
+  if (!editable) return false;
+  for (const name of ["onkeydown", "onkeypress", "onkeyup"]) {
+    if (el[name] || el.hasAttribute(name)) return false;
+  }
+  const role = (el.getAttribute("role") || "").toLowerCase();
+  if (role === "combobox" || el.hasAttribute("aria-autocomplete") || el.hasAttribute("list")) {
+    return false;
+  }
+  return true;
+}
+"""
+
+
+def default_write_mode() -> WriteMode:
+    mode = os.environ.get("WRITE_MODE", "type").lower().strip()
+    if mode not in ("auto", "insert", "type"):
+        logger.warning("Unknown WRITE_MODE=%r; using 'type'", mode)
+        return "type"
+    return mode  # type: ignore[return-value]
+
+
+async def write_text(page: Any, text: str, mode: WriteMode = "type") -> Literal["insert", "type"]:
+    """Enter ``text`` into the focused element and return the path used.
+
+    ``type`` (the default) dispatches keydown/keypress/keyup per character.
+    ``insert`` sends the whole string as a single ``input`` event
+    (``Input.insertText``), so key listeners never fire. ``auto`` inserts
+    strings of at least ``WRITE_INSERT_MIN_CHARS`` without newlines into
+    editables without inline key handlers or combobox roles, and types
+    everything else; it cannot see listeners attached with
+    ``addEventListener``, so opt into it only for apps that do not watch keys.
+    """
+    if mode == "auto":
+        mode = "type"
+        if len(text) >= INSERT_MIN_CHARS and "\n" not in text:
+            try:
+                if await page.evaluate(_INSERTABLE_JS):
+                    mode = "insert"
+            except Exception as e:
+                logger.debug("Editable probe failed (%s); typing", e)
+
+    if mode == "insert":
+        await page.keyboard.insert_text(text)
+    else:
+        await page.keyboard.type(text)
+    return mode
+
+
+# =============================================================================
+# Drag
+# =============================================================================
+
+# CDP Input.dispatchMouseEvent modifier and button bitmasks
+_MODIFIER_BITS = {"Alt": 1, "Control": 2, "Meta": 4, "Shift": 8}
+_BUTTON_BITS = {"left": 1, "right": 2, "middle": 4}
+
+
+@dataclass(frozen=True)
+class DragConfig:
+    """How drag paths are turned into mouse events.
+
+    ``pipelined`` (``DRAG_MODE=pipelined``) sends raw CDP mouse events without
+    awaiting each one. That bypasses Playwright's drag interception, so
+    HTML5 ``draggable`` widgets get no ``dragstart``/``drop``; the default
+    ``sequential`` mode awaits ``page.mouse`` per point and supports them.
+    ``step_px`` inserts intermediate points so no two consecutive events are
+    further apart than that (0 = send the path as given). ``duration_ms``
+    spreads the events over that long at ``rate_hz`` instead of sending them
+    back to back (0 = as fast as the browser accepts them).
+    """
+
+    pipelined: bool = False
+    step_px: float = 0
+    duration_ms: float = 0
+    rate_hz: float = 60
+
+    @classmethod
+    def from_env(cls) -> "DragConfig":
+        return cls(
+            pipelined=os.environ.get("DRAG_MODE", "sequential").lower().strip() == "pipelined",
+            step_px=float(os.environ.get("DRAG_STEP_PX", "0")),
+            duration_ms=float(os.environ.get("DRAG_DURATION_MS", "0")),
+            rate_hz=float(os.environ.get("DRAG_RATE_HZ", "60")),
+        )
+
+
+def interpolate_path(
+    path: list[tuple[int, int]], step_px: float = 0, count: int = 0
+) -> list[tuple[float, float]]:
+    """Insert points into ``path`` so segments are at most ``step_px`` long.
+
+    With ``count`` (and no ``step_px``) the step is chosen so the path has
+    about ``count`` points. Every given waypoint is kept, so corners are
+    never cut; points are only added between them.
+    """
+    points = [(float(x), float(y)) for x, y in path]
+    lengths = [math.dist(a, b) for a, b in zip(points, points[1:])]
+    total = sum(lengths)
+    if total == 0:
+        return points
+    if step_px <= 0 and count >= 2:
+        step_px = total / (count - 1)
+    if step_px <= 0:
+        return points
+
+    result = [points[0]]
+    for (ax, ay), (bx, by), length in zip(points, points[1:], lengths):
+        steps = max(1, math.ceil(length / step_px))
+        for i in range(1, steps + 1):
+            t = i / steps
+            result.append((ax + (bx - ax) * t, ay + (by - ay) * t))
+    return result
+
+
+async def dispatch_drag(
+    page: Any,
+    path: list[tuple[int, int]],
+    button: Literal["left", "right", "middle"] = "left",
+    modifiers: list[str] | None = None,
+    config: DragConfig | None = None,
+) -> int:
+    """Press at ``path[0]``, move through the rest and release; return events sent.
+
+    With CDP available and ``config.pipelined`` the whole sequence is written
+    to the DevTools session without waiting for each acknowledgement - the
+    browser still applies the events in order - so latency no longer grows
+    with the number of points. Otherwise each point is an awaited
+    ``page.mouse.move``.
+    """
+    config = config or DragConfig.from_env()
+    count = 0
+    if config.duration_ms > 0:
+        count = max(2, math.ceil(config.duration_ms / 1000 * config.rate_hz))
+    points = interpolate_path(path, config.step_px, count)
+
+    cdp = await cdp_session(page) if config.pipelined else None
+    if cdp is None:
+        interval = config.duration_ms / 1000 / max(1, len(points) - 1)
+        await page.mouse.move(*points[0])
+        await page.mouse.down(button=button)
+        for x, y in points[1:]:
+            if interval:
+                await asyncio.sleep(interval)
+            await page.mouse.move(x, y)
+        await page.mouse.up(button=button)
+        return len(points) + 2
+
+    mods = sum(_MODIFIER_BITS.get(m, 0) for m in modifiers or [])
+    pressed = _BUTTON_BITS[button]
+    start_x, start_y = points[0]
+    end_x, end_y = points[-1]
+    events = [
+        {"type": "mouseMoved", "x": start_x, "y": start_y, "modifiers": mods},
+        {"type": "mousePressed", "x": start_x, "y": start_y, "button": button,
+         "buttons": pressed, "clickCount": 1, "modifiers": mods},
+        *(
+            {"type": "mouseMoved", "x": x, "y": y, "button": button,
+             "buttons": pressed, "modifiers": mods}
+            for x, y in points[1:]
+        ),
+        {"type": "mouseReleased", "x": end_x, "y": end_y, "button": button,
+         "buttons": 0, "clickCount": 1, "modifiers": mods},
+    ]
+
+    interval = config.duration_ms / 1000 / max(1, len(points) - 1)
+    pending = []
+    for event in events:
+        # Tasks start in creation order, so commands hit the wire in order
+        pending.append(asyncio.ensure_future(cdp.send("Input.dispatchMouseEvent", event)))
+        if interval and event["type"] == "mouseMoved" and len(pending) > 2:
+            await asyncio.sleep(interval)
+    await asyncio.gather(*pending)
+    return len(events)
+
+
+__all__ = [
+    "WriteMode",
+    "default_write_mode",
+    "write_text",
+    "DragConfig",
+    "interpolate_path",
+    "dispatch_drag",
+]
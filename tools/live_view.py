@@ -0,0 +1,325 @@
+"""Live view of the browser over HTTP, from Chromium's own screencast.
+
+``LIVE_VIEW_PORT`` serves an MJPEG stream (``/stream``) of the page an
+episode is driving, viewable in any browser at ``/``, and works the same in
+headless mode, so no X server, VNC or noVNC is needed to watch episodes.
+``/contexts`` lists the pooled contexts in use by index and ``?context=<n>``
+pins a stream to one of them; otherwise it follows the most recently started
+episode. MCP session IDs are never exposed. The server listens on
+``LIVE_VIEW_HOST`` (default ``127.0.0.1``); set it to ``0.0.0.0`` only on a
+trusted network, since the stream has no authentication.
+
+A page is screencast only while someone watches it: the CDP screencast
+starts with the first viewer and stops with the last. Chromium emits frames
+only when the page repaints, and each frame is acknowledged no sooner than
+the frame interval, which is at most ``LIVE_VIEW_MAX_FPS`` and grows when
+viewers take longer to receive frames, so an idle page or a slow link costs
+next to nothing.
+"""
+import asyncio
+import base64
+import json
+import logging
+import os
+import time
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger(__name__)
+
+_INDEX_HTML = """<!doctype html>
+<title>UI-CUBE live view</title>
+<body style="margin:0;background:#1e1e1e">
+<img src="/stream{query}" style="display:block;max-width:100%;margin:auto">
+</body>
+"""
+
+
+class _Screencast:
+    """One page's CDP screencast, running only while it has viewers."""
+
+    def __init__(self, page: Any, view: "LiveView") -> None:
+        self.page = page
+        self.view = view
+        self.viewers = 0
+        self.frame: bytes | None = None
+        self.seq = 0
+        self.interval = view.min_interval
+        self.next_frame = asyncio.Event()
+        self._cdp: Any = None
+        self._last_ack = 0.0
+
+    async def attach(self) -> None:
+        self.viewers += 1
+        if self.viewers == 1:
+            try:
+                await self._start()
+            except BaseException:
+                self.viewers -= 1
+                raise
+
+    async def detach(self) -> None:
+        self.viewers -= 1
+        if self.viewers == 0:
+            await self._stop()
+
+    async def _start(self) -> None:
+        self._cdp = await self.page.context.new_cdp_session(self.page)
+        self._cdp.on("Page.screencastFrame", self._on_frame)
+        await self._cdp.send(
+            "Page.startScreencast",
+            {
+                "format": "jpeg",
+                "quality": self.view.quality,
+                "maxWidth": self.view.max_width,
+                "maxHeight": self.view.max_height,
+            },
+        )
+        self.view.screencasts_started += 1
+        logger.info("Live view: screencast started on %s", self.page.url)
+
+    async def _stop(self) -> None:
+        cdp, self._cdp = self._cdp, None
+        if cdp is None:
+            return
+        try:
+            await cdp.send("Page.stopScreencast")
+            await cdp.detach()
+        except Exception as e:
+            # The page or context may already be gone
+            logger.debug("Live view: stopping screencast failed: %s", e)
+        logger.info("Live view: screencast stopped (no viewers)")
+
+    def _on_frame(self, params: dict[str, Any]) -> None:
+        asyncio.ensure_future(self._accept(params))
+
+    async def _accept(self, params: dict[str, Any]) -> None:
+        self.frame = base64.b64decode(params["data"])
+        self.seq += 1
+        self.view.frames += 1
+        self.view.bytes += len(self.frame)
+        self.next_frame.set()
+        self.next_frame = asyncio.Event()
+
+        # Chromium sends nothing more until this frame is acknowledged
+        delay = self.interval - (time.monotonic() - self._last_ack)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._last_ack = time.monotonic()
+        cdp = self._cdp
+        if cdp is not None:
+            try:
+                await cdp.send("Page.screencastFrameAck", {"sessionId": params["sessionId"]})
+            except Exception as e:
+                logger.debug("Live view: frame ack failed: %s", e)
+
+    def observe_send(self, seconds: float) -> None:
+        """Slow the source to how fast viewers actually take frames."""
+        target = min(max(seconds * 1.5, self.view.min_interval), 1.0)
+        self.interval = 0.8 * self.interval + 0.2 * target
+
+
+class LiveView:
+    """MJPEG live-view server for a :class:`~tools.browser.PlaywrightTool`."""
+
+    def __init__(
+        self,
+        playwright_tool: Any,
+        host: str,
+        port: int,
+        url: str | None = None,
+        max_fps: float = 10.0,
+        quality: int = 60,
+        max_width: int = 1280,
+        max_height: int = 1280,
+    ) -> None:
+        self.playwright_tool = playwright_tool
+        self.host = host
+        self.port = port
+        self.url = url or f"http://localhost:{port}/"
+        self.min_interval = 1.0 / max_fps
+        self.quality = quality
+        self.max_width = max_width
+        self.max_height = max_height
+        self.viewers = 0
+        self.frames = 0
+        self.bytes = 0
+        self.screencasts_started = 0
+        self._casts: dict[Any, _Screencast] = {}
+        self._server: asyncio.AbstractServer | None = None
+
+    @classmethod
+    def from_env(cls, playwright_tool: Any) -> "LiveView | None":
+        """Server on ``LIVE_VIEW_PORT`` (default 8090; 0 disables).
+
+        Browser workers (``BROWSER_WORKERS``) each serve on the next port up:
+        worker 0 on ``LIVE_VIEW_PORT + 1`` and so on.
+        """
+        port = int(os.environ.get("LIVE_VIEW_PORT", "8090"))
+        if port <= 0:
+            return None
+        url = os.environ.get("LIVE_VIEW_URL") or None
+        worker_index = os.environ.get("UI_CUBE_WORKER_INDEX")
+        if worker_index is not None:
+            port += 1 + int(worker_index)
+            url = None
+        return cls(
+            playwright_tool,
+            host=os.environ.get("LIVE_VIEW_HOST", "127.0.0.1"),
+            port=port,
+            url=url,
+            max_fps=float(os.environ.get("LIVE_VIEW_MAX_FPS", "10")),
+            quality=int(os.environ.get("LIVE_VIEW_QUALITY", "60")),
+            max_width=int(os.environ.get("LIVE_VIEW_MAX_WIDTH", "1280")),
+            max_height=int(os.environ.get("LIVE_VIEW_MAX_HEIGHT", "1280")),
+        )
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        logger.info("Live view at %s (streams only while watched)", self.url)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for cast in list(self._casts.values()):
+            await cast._stop()
+        self._casts.clear()
+
+    # ------------------------------------------------------------------
+    # Pages
+    # ------------------------------------------------------------------
+
+    def _page_for(self, context: int | None) -> Any:
+        pool = self.playwright_tool.pool
+        if pool is not None:
+            leases = list(pool._leases.values())
+            if context is not None:
+                lease = next((lease for lease in leases if lease.index == context), None)
+                return lease.page if lease else None
+            if leases:
+                return max(leases, key=lambda lease: lease.acquired_at).page
+        return self.playwright_tool.env
+
+    def _contexts(self) -> list[dict[str, Any]]:
+        pool = self.playwright_tool.pool
+        if pool is None:
+            return []
+        return sorted(
+            ({"context": lease.index, "url": lease.page.url} for lease in pool._leases.values()),
+            key=lambda entry: entry["context"],
+        )
+
+    async def _watch(self, page: Any) -> _Screencast:
+        cast = self._casts.get(page)
+        if cast is None:
+            cast = self._casts[page] = _Screencast(page, self)
+        await cast.attach()
+        return cast
+
+    async def _unwatch(self, cast: _Screencast) -> None:
+        await cast.detach()
+        if cast.viewers == 0 and self._casts.get(cast.page) is cast:
+            del self._casts[cast.page]
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=10)
+            parts = head.split(b"\r\n", 1)[0].decode("latin-1").split()
+            target = urlparse(parts[1] if len(parts) > 1 else "/")
+            raw = parse_qs(target.query).get("context", [""])[0]
+            context = int(raw) if raw.isdigit() else None
+
+            if target.path == "/stream":
+                await self._stream(reader, writer, context)
+            elif target.path == "/":
+                query = f"?context={context}" if context is not None else ""
+                self._respond(writer, "text/html; charset=utf-8", _INDEX_HTML.format(query=query).encode())
+            elif target.path == "/contexts":
+                self._respond(writer, "application/json", json.dumps(self._contexts()).encode())
+            else:
+                self._respond(writer, "text/plain", b"Not found", status="404 Not Found")
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        except Exception as e:
+            logger.warning("Live view request failed: %s", e)
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _respond(writer: asyncio.StreamWriter, content_type: str, body: bytes, status: str = "200 OK") -> None:
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nCache-Control: no-store\r\nConnection: close\r\n\r\n".encode()
+            + body
+        )
+
+    async def _stream(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, context: int | None
+    ) -> None:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: multipart/x-mixed-replace; boundary=frame\r\n"
+            b"Cache-Control: no-store\r\nConnection: close\r\n\r\n"
+        )
+        self.viewers += 1
+        cast: _Screencast | None = None
+        seen = 0
+        try:
+            while not reader.at_eof():
+                page = self._page_for(context)
+                if cast is not None and cast.page is not page:
+                    await self._unwatch(cast)
+                    cast = None
+                if page is None:
+                    await asyncio.sleep(0.5)
+                    continue
+                if cast is None:
+                    try:
+                        cast = await self._watch(page)
+                    except Exception as e:
+                        logger.debug("Live view: cannot screencast page: %s", e)
+                        await asyncio.sleep(0.5)
+                        continue
+                    seen = 0
+
+                if cast.seq == seen:
+                    try:
+                        await asyncio.wait_for(cast.next_frame.wait(), timeout=1.0)
+                    except asyncio.TimeoutError:
+                        # Re-check the viewer and which page to show
+                        continue
+                frame, seen = cast.frame, cast.seq
+                if frame is None:
+                    continue
+                started = time.monotonic()
+                writer.write(
+                    b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n" % len(frame)
+                    + frame
+                    + b"\r\n"
+                )
+                await writer.drain()
+                cast.observe_send(time.monotonic() - started)
+        finally:
+            self.viewers -= 1
+            if cast is not None:
+                await self._unwatch(cast)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "url": self.url,
+            "viewers": self.viewers,
+            "screencasts": len(self._casts),
+            "screencasts_started": self.screencasts_started,
+            "frames": self.frames,
+            "bytes": self.bytes,
+            "fps_cap": [round(1 / cast.interval, 1) for cast in self._casts.values()],
+        }
+
+
+__all__ = ["LiveView"]
@@ -0,0 +1,143 @@
+"""Batched action tool: run several primitive actions, return one screenshot."""
+import asyncio
+import logging
+import time
+from typing import Any, Literal
+
+from mcp.types import ContentBlock
+from pydantic import BaseModel, Field
+
+from hud.tools.types import ContentResult
+from tools.browser import router
+
+logger = logging.getLogger(__name__)
+
+MAX_ACTIONS = 50
+
+# Executor set by register_computer_tools during initialization
+_executor: Any = None
+
+
+class MacroAction(BaseModel):
+    """One primitive action. Coordinates are viewport pixels of a full-size screenshot."""
+
+    action: Literal["click", "double_click", "type", "press", "scroll", "move", "drag", "wait"]
+    x: int | None = Field(None, description="X coordinate (click, double_click, scroll, move)")
+    y: int | None = Field(None, description="Y coordinate (click, double_click, scroll, move)")
+    button: Literal["left", "right", "middle"] = "left"
+    text: str | None = Field(None, description="Text to type (type)")
+    enter: bool = Field(False, description="Press Enter after typing (type)")
+    mode: Literal["auto", "insert", "type"] | None = Field(
+        None, description="insert = paste whole string, type = per-key events (type)"
+    )
+    keys: list[str] | None = Field(None, description="Key combination, e.g. ['ctrl', 'a'] (press)")
+    scroll_x: int | None = Field(None, description="Horizontal scroll amount in pixels (scroll)")
+    scroll_y: int | None = Field(None, description="Vertical scroll amount in pixels (scroll)")
+    path: list[tuple[int, int]] | None = Field(None, description="Drag path points (drag)")
+    ms: int | None = Field(None, description="Milliseconds to wait, max 5000 (wait)")
+    settle: bool = Field(False, description="Wait for the UI to settle after this step")
+
+
+def set_macro_executor(executor: Any) -> None:
+    global _executor
+    _executor = executor
+
+
+async def _run_action(executor: Any, step: MacroAction) -> ContentResult:
+    match step.action:
+        case "click" | "double_click":
+            return await executor.click(
+                x=step.x,
+                y=step.y,
+                button=step.button,
+                # hud pattern convention: one delay -> two clicks (clickCount 1, 2)
+                pattern=[100] if step.action == "double_click" else None,
+                take_screenshot=False,
+            )
+        case "type":
+            if step.text is None:
+                return ContentResult(error="type requires text")
+            if step.mode and hasattr(executor, "write_mode"):
+                return await executor.write(
+                    step.text, enter_after=step.enter, take_screenshot=False, mode=step.mode
+                )
+            return await executor.write(step.text, enter_after=step.enter, take_screenshot=False)
+        case "press":
+            if not step.keys:
+                return ContentResult(error="press requires keys")
+            return await executor.press(step.keys, take_screenshot=False)
+        case "scroll":
+            return await executor.scroll(
+                x=step.x,
+                y=step.y,
+                scroll_x=step.scroll_x,
+                scroll_y=step.scroll_y,
+                take_screenshot=False,
+            )
+        case "move":
+            return await executor.move(x=step.x, y=step.y, take_screenshot=False)
+        case "drag":
+            return await executor.drag(step.path or [], button=step.button, take_screenshot=False)
+        case "wait":
+            await asyncio.sleep(min(step.ms or 0, 5000) / 1000)
+            return ContentResult(output=f"Waited {step.ms} ms")
+    return ContentResult(error=f"Unknown action {step.action}")
+
+
+@router.tool("computer_batch")
+async def computer_batch(
+    actions: list[MacroAction],
+    settle: bool = False,
+    stop_on_error: bool = True,
+) -> list[ContentBlock]:
+    """Run an ordered list of UI actions in one call and return a single final screenshot.
+
+    Use this for predictable sequences such as filling a form: click a field,
+    type, press Tab, type, click Save. Coordinates are pixels of the full-size
+    viewport. Each step reports ok/failed with its duration; the screenshot is
+    taken after the last step.
+
+    Args:
+        actions: Actions to run in order (click, double_click, type, press, scroll, move, drag, wait)
+        settle: Wait for the UI to settle after every step, not only those marked settle
+        stop_on_error: Skip the remaining steps after the first failure
+    """
+    executor = _executor
+    if executor is None:
+        return ContentResult(error="Computer executor not initialized").to_content_blocks()
+    if len(actions) > MAX_ACTIONS:
+        return ContentResult(error=f"At most {MAX_ACTIONS} actions per batch").to_content_blocks()
+
+    can_settle = hasattr(executor, "wait_settled")
+    lines: list[str] = []
+    failed = False
+    for i, step in enumerate(actions, 1):
+        if failed and stop_on_error:
+            lines.append(f"{i}. {step.action}: skipped")
+            continue
+        start = time.perf_counter()
+        try:
+            result = await _run_action(executor, step)
+            error = result.error
+        except Exception as e:
+            error = str(e)
+        settled_note = ""
+        if not error and (settle or step.settle) and can_settle:
+            try:
+                settled = await executor.wait_settled()
+                settled_note = f", {settled.describe()}"
+            except Exception as e:
+                error = f"settle failed: {e}"
+        status = f"failed: {error}" if error else f"ok{settled_note}"
+        lines.append(f"{i}. {step.action}: {status} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+        failed = failed or bool(error)
+
+    logger.info("computer_batch ran %d actions (%s)", len(actions), "failed" if failed else "ok")
+    screenshot = await executor.screenshot()
+    result = ContentResult(output="\n".join(lines), base64_image=screenshot)
+    if failed:
+        result.error = "One or more actions failed"
+    return result.to_content_blocks()
+
+
+__all__ = ["MacroAction", "computer_batch", "set_macro_executor"]
@@ -0,0 +1,158 @@
+"""Low-overhead in-process latency and payload metrics.
+
+Each series keeps a running count/sum plus a bounded reservoir of recent
+samples; percentiles are computed only when metrics are read, so recording
+is an append and stays cheap enough to leave on in production. Disable with
+``METRICS_ENABLED=0``.
+"""
+import functools
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_RESERVOIR = int(os.environ.get("METRICS_RESERVOIR", "2048"))
+_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class _Series:
+    __slots__ = ("count", "total", "samples")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.samples: deque[float] = deque(maxlen=_RESERVOIR)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+    def summary(self) -> dict[str, float]:
+        ordered = sorted(self.samples)
+        out = {"count": self.count, "sum": round(self.total, 6)}
+        for q in _QUANTILES:
+            out[f"p{round(q * 100)}"] = _quantile(ordered, q)
+        return out
+
+
+def _quantile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return round(ordered[index], 6)
+
+
+class MetricsRegistry:
+    """Named latency histograms (seconds) and size histograms (bytes)."""
+
+    def __init__(self, enabled: bool | None = None) -> None:
+        if enabled is None:
+            enabled = os.environ.get("METRICS_ENABLED", "1").lower() in ("1", "true", "yes")
+        self.enabled = enabled
+        self._latency: dict[str, _Series] = {}
+        self._bytes: dict[str, _Series] = {}
+
+    def observe(self, name: str, seconds: float) -> None:
+        if self.enabled:
+            series = self._latency.get(name)
+            if series is None:
+                series = self._latency[name] = _Series()
+            series.add(seconds)
+
+    def observe_bytes(self, name: str, size: int) -> None:
+        if self.enabled:
+            series = self._bytes.get(name)
+            if series is None:
+                series = self._bytes[name] = _Series()
+            series.add(size)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def reset(self) -> None:
+        self._latency.clear()
+        self._bytes.clear()
+
+    def export(self) -> dict[str, dict[str, tuple[int, float, list[float]]]]:
+        """Raw series as (count, sum, recent samples), e.g. to send to another process."""
+        return {
+            kind: {name: (s.count, s.total, list(s.samples)) for name, s in table.items()}
+            for kind, table in (("latency", self._latency), ("bytes", self._bytes))
+        }
+
+    def merge(self, exported: dict[str, dict[str, tuple[int, float, list[float]]]]) -> None:
+        """Add series from :meth:`export` of another registry into this one."""
+        for kind, table in (("latency", self._latency), ("bytes", self._bytes)):
+            for name, (count, total, samples) in exported.get(kind, {}).items():
+                series = table.get(name)
+                if series is None:
+                    series = table[name] = _Series()
+                series.count += count
+                series.total += total
+                series.samples.extend(samples)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Percentiles per series; latencies in milliseconds, sizes in bytes."""
+        latency = {}
+        for name, series in sorted(self._latency.items()):
+            summary = series.summary()
+            latency[name] = {
+                k: (v if k == "count" else round(v * 1000, 3)) for k, v in summary.items()
+            }
+        sizes = {name: series.summary() for name, series in sorted(self._bytes.items())}
+        return {"latency_ms": latency, "bytes": sizes}
+
+    def to_prometheus(self, prefix: str = "uicube") -> str:
+        """Prometheus text exposition (summaries with p50/p95/p99 quantiles)."""
+        lines: list[str] = []
+        for kind, unit, table in (
+            ("latency", "seconds", self._latency),
+            ("payload", "bytes", self._bytes),
+        ):
+            metric = f"{prefix}_{kind}_{unit}"
+            if not table:
+                continue
+            lines.append(f"# TYPE {metric} summary")
+            for name, series in sorted(table.items()):
+                summary = series.summary()
+                label = f'op="{name}"'
+                for q in _QUANTILES:
+                    value = summary[f"p{round(q * 100)}"]
+                    lines.append(f'{metric}{{{label},quantile="{q}"}} {value}')
+                lines.append(f"{metric}_sum{{{label}}} {summary['sum']}")
+                lines.append(f"{metric}_count{{{label}}} {summary['count']}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def timed(name: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Record the latency of an async function under ``name``."""
+
+    def decorator(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            if not metrics.enabled:
+                return await fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                metrics.observe(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+__all__ = ["MetricsRegistry", "metrics", "timed"]
@@ -0,0 +1,223 @@
+"""Streaming trajectory recorder: one append-only gzip JSONL file per episode.
+
+Enabled by setting ``TRAJECTORY_DIR``. Each line is one record:
+
+    {"type": "episode", "task_id": ..., "session": ..., "started_at": ...}
+    {"type": "frame", "id": "<hash>", "data": "<base64>"}
+    {"type": "action", "step": 3, "action": "click", "args": {...},
+     "started_at": ..., "duration_ms": ..., "output": ..., "error": ..., "frame": "<hash>"}
+    {"type": "end", "reward": 1.0, ...}
+
+Frames are content-hashed and written only the first time they are seen;
+actions refer to them by ID. Records go through a bounded queue to a writer
+thread, so tool calls never wait on compression or disk. When the queue is
+full, frame payloads are dropped (the action record keeps ``frame_dropped``)
+rather than growing memory.
+"""
+import asyncio
+import functools
+import gzip
+import hashlib
+import inspect
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, TypeVar
+
+from tools.context_pool import session_key
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_STOP = object()
+
+_recorders: dict[str, "TrajectoryRecorder"] = {}
+
+
+class TrajectoryRecorder:
+    """Writes one episode's records from a background thread."""
+
+    def __init__(self, path: Path, max_queue: int | None = None) -> None:
+        self.path = path
+        self.step = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self._seen: set[bytes] = set()
+        self._queue: queue.Queue[Any] = queue.Queue(
+            maxsize=max_queue or int(os.environ.get("TRAJECTORY_QUEUE", "256"))
+        )
+        self._thread = threading.Thread(target=self._run, name=f"trajectory-{path.stem}", daemon=True)
+        self._thread.start()
+
+    def event(self, record: dict[str, Any]) -> None:
+        """Queue a non-frame record (dropped with a warning if the writer is far behind)."""
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            logger.warning("Trajectory queue full; dropping %s record", record.get("type"))
+
+    def action(self, record: dict[str, Any], frame: str | None = None) -> None:
+        self.step += 1
+        record = {"type": "action", "step": self.step, **record}
+        if frame:
+            digest = hashlib.blake2b(frame.encode("ascii"), digest_size=12).digest()
+            frame_id = digest.hex()
+            record["frame"] = frame_id
+            if digest not in self._seen:
+                try:
+                    self._queue.put_nowait({"type": "frame", "id": frame_id, "data": frame})
+                    self._seen.add(digest)
+                    self.frames_written += 1
+                except queue.Full:
+                    record["frame_dropped"] = True
+                    self.frames_dropped += 1
+        self.event(record)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._queue.put, _STOP)
+        await asyncio.to_thread(self._thread.join)
+
+    def _run(self) -> None:
+        try:
+            with gzip.open(self.path, "at", encoding="utf-8") as fh:
+                while True:
+                    item = self._queue.get()
+                    if item is _STOP:
+                        break
+                    fh.write(json.dumps(item, default=str) + "\n")
+                    if self._queue.empty():
+                        # Sync-flush so a crash leaves a readable prefix
+                        fh.flush()
+        except Exception as e:
+            logger.error("Trajectory writer for %s failed: %s", self.path, e)
+
+
+def _trajectory_dir() -> Path | None:
+    value = os.environ.get("TRAJECTORY_DIR")
+    return Path(value) if value else None
+
+
+def start_recording(task_id: str, session: str | None = None, **info: Any) -> TrajectoryRecorder | None:
+    """Open a trajectory file for ``session``'s new episode (no-op if disabled)."""
+    directory = _trajectory_dir()
+    if directory is None:
+        return None
+    session = session or session_key()
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    safe_session = re.sub(r"[^A-Za-z0-9_-]", "", session)[:12]
+    path = directory / f"{task_id}-{stamp}-{safe_session}.jsonl.gz"
+
+    previous = _recorders.pop(session, None)
+    if previous is not None:
+        asyncio.ensure_future(previous.close())
+
+    recorder = TrajectoryRecorder(path)
+    recorder.event(
+        {"type": "episode", "task_id": task_id, "session": session, "started_at": time.time(), **info}
+    )
+    _recorders[session] = recorder
+    logger.info("Recording trajectory to %s", path)
+    return recorder
+
+
+async def stop_recording(session: str | None = None, **info: Any) -> None:
+    """Write the end record for ``session``'s episode and close its file."""
+    recorder = _recorders.pop(session or session_key(), None)
+    if recorder is None:
+        return
+    recorder.event(
+        {
+            "type": "end",
+            "ended_at": time.time(),
+            "steps": recorder.step,
+            "frames": recorder.frames_written,
+            "frames_dropped": recorder.frames_dropped,
+            **info,
+        }
+    )
+    await recorder.close()
+
+
+def read_trajectory(path: Path) -> dict[str, Any]:
+    """Load a trajectory file as ``{"task_id", "actions", "reward", "frames"}``.
+
+    A file cut short by a crash still loads up to its last complete record.
+    """
+    episode: dict[str, Any] = {"task_id": None, "actions": [], "reward": None, "frames": {}}
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                kind = record.get("type")
+                if kind == "episode":
+                    episode["task_id"] = record.get("task_id")
+                elif kind == "action":
+                    episode["actions"].append(record)
+                elif kind == "frame":
+                    episode["frames"][record["id"]] = record["data"]
+                elif kind == "end":
+                    episode["reward"] = record.get("reward")
+    except EOFError:
+        logger.warning("Trajectory %s is truncated", path)
+    return episode
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def recorded(action: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Record calls of an executor method (args, timing, result, frame) when recording."""
+
+    def decorator(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            recorder = _recorders.get(session_key()) if _recorders else None
+            if recorder is None:
+                return await fn(*args, **kwargs)
+
+            started_at = time.time()
+            start = time.perf_counter()
+            result = await fn(*args, **kwargs)
+            duration_ms = (time.perf_counter() - start) * 1000
+
+            bound = signature.bind(*args, **kwargs)
+            arguments = {k: _jsonable(v) for k, v in bound.arguments.items() if k != "self"}
+            frame = result if isinstance(result, str) else getattr(result, "base64_image", None)
+            recorder.action(
+                {
+                    "action": action,
+                    "args": arguments,
+                    "started_at": started_at,
+                    "duration_ms": round(duration_ms, 3),
+                    "output": getattr(result, "output", None),
+                    "error": getattr(result, "error", None),
+                },
+                frame=frame,
+            )
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+__all__ = ["TrajectoryRecorder", "read_trajectory", "recorded", "start_recording", "stop_recording"]
@@ -0,0 +1,138 @@
+"""Episode admission for many concurrent MCP sessions on one environment.
+
+Each episode holds one pooled browser context from scenario setup until it is
+graded. The scheduler admits at most ``max_concurrent`` episodes, queues the
+rest in arrival order, and rejects new episodes once ``max_queue`` are
+already waiting, so an overloaded container pushes back instead of
+degrading every episode. Leases older than ``EPISODE_MAX_S`` (a client that
+disconnected mid-episode) are reclaimed when others are waiting.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any
+
+from tools.context_pool import ContextPool, PooledContext, session_key
+from tools.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerFull(RuntimeError):
+    """Raised when the episode queue is at ``max_queue``."""
+
+
+class EpisodeScheduler:
+    """Bounded-concurrency, bounded-queue front of a :class:`ContextPool`."""
+
+    def __init__(
+        self,
+        pool: ContextPool,
+        max_concurrent: int | None = None,
+        max_queue: int | None = None,
+        max_episode_s: float | None = None,
+    ) -> None:
+        self.pool = pool
+        self.max_concurrent = max_concurrent or int(
+            os.environ.get("EPISODE_MAX_CONCURRENCY") or pool.size
+        )
+        if self.max_concurrent > pool.size:
+            logger.warning(
+                "EPISODE_MAX_CONCURRENCY=%d exceeds BROWSER_POOL_SIZE=%d; episodes beyond the pool wait",
+                self.max_concurrent,
+                pool.size,
+            )
+        self.max_queue = max_queue if max_queue is not None else int(os.environ.get("EPISODE_MAX_QUEUE", "64"))
+        self.max_episode_s = max_episode_s or float(os.environ.get("EPISODE_MAX_S", "1800"))
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self.queued = 0
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.reclaimed = 0
+
+    async def acquire(self, session: str | None = None) -> PooledContext:
+        """Wait for a slot, then check out a context for ``session``."""
+        session = session or session_key()
+        stale = self.pool.lease_for(session)
+        if stale is not None:
+            # Same session starting a new episode without grading the last one
+            await self.release(stale, session)
+
+        # A free slot admits immediately; only episodes that would wait count
+        # against the queue limit (so EPISODE_MAX_QUEUE=0 means "never queue")
+        if self._slots.locked() and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise SchedulerFull(
+                f"{self.active} episodes running and {self.queued} queued; try again later"
+            )
+
+        self.queued += 1
+        start = time.perf_counter()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._slots.acquire(), timeout=5)
+                    break
+                except asyncio.TimeoutError:
+                    await self._reclaim_stale()
+        finally:
+            self.queued -= 1
+        waited = time.perf_counter() - start
+        metrics.observe("scheduler.wait", waited)
+
+        try:
+            lease = await self.pool.acquire(session)
+        except BaseException:
+            self._slots.release()
+            raise
+        self.active += 1
+        self.admitted += 1
+        if waited > 0.05:
+            logger.info("Session %s admitted after %.0f ms in queue", session, waited * 1000)
+        return lease
+
+    async def release(self, lease: PooledContext, session: str) -> None:
+        """Return ``session``'s context and free its slot.
+
+        Does nothing unless ``session`` still holds ``lease``: a reclaimed
+        context may already be checked out by another session.
+        """
+        if lease.session != session or self.pool.lease_for(session) is not lease:
+            return
+        try:
+            await self.pool.release(lease)
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+    async def _reclaim_stale(self) -> None:
+        now = time.monotonic()
+        for lease in list(self.pool._leases.values()):
+            if now - lease.acquired_at > self.max_episode_s:
+                logger.warning(
+                    "Reclaiming context %d from session %s after %.0f s",
+                    lease.index,
+                    lease.session,
+                    now - lease.acquired_at,
+                )
+                self.reclaimed += 1
+                await self.release(lease, lease.session)
+
+    def stats(self) -> dict[str, Any]:
+        wait = metrics.snapshot()["latency_ms"].get("scheduler.wait", {})
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "reclaimed": self.reclaimed,
+            "wait_ms_p50": wait.get("p50", 0.0),
+            "wait_ms_p95": wait.get("p95", 0.0),
+        }
+
+
+__all__ = ["EpisodeScheduler", "SchedulerFull"]
@@ -0,0 +1,146 @@
+"""Adaptive "UI settled" wait used before post-action screenshots."""
+import asyncio
+import logging
+import os
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Resolves once the DOM has not mutated for quietMs and no finite animation is
+# running, or when timeoutMs elapses. Infinite animations (spinners, pulsing
+# cursors) are ignored so they cannot pin every wait to the cap.
+_SETTLE_JS = """
+async ({ quietMs, timeoutMs }) => {
+  const t0 = performance.now();
+  let lastMutation = t0;
+  const observer = new MutationObserver(() => { lastMutation = performance.now(); });
+  observer.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+  const animating = () => document.getAnimations().some((a) => {
+    if (a.playState !== "running") return false;
+    const timing = a.effect && a.effect.getTiming ? a.effect.getTiming() : null;
+    return !timing || timing.iterations !== Infinity;
+  });
+  const frame = () => new Promise((resolve) => {
+    requestAnimationFrame(resolve);
+    setTimeout(resolve, 50);
+  });
+  try {
+    for (;;) {
+      await frame();
+      const now = performance.now();
+      if (now - lastMutation >= quietMs && !animating()) {
+        return { settled: true, waited: now - t0 };
+      }
+      if (now - t0 >= timeoutMs) {
+        return { settled: false, waited: now - t0, animating: animating() };
+      }
+    }
+  } finally {
+    observer.disconnect();
+  }
+}
+"""
+
+
+@dataclass(frozen=True)
+class SettleConfig:
+    """Opt-in settle mode: wait for quiet DOM, animations and network, up to a cap."""
+
+    enabled: bool = False
+    timeout_ms: int = 1500
+    quiet_ms: int = 100
+
+    @classmethod
+    def from_env(cls) -> "SettleConfig":
+        return cls(
+            enabled=os.environ.get("SETTLE_MODE", "0").lower() in ("1", "true", "yes", "on"),
+            timeout_ms=int(os.environ.get("SETTLE_TIMEOUT_MS", "1500")),
+            quiet_ms=int(os.environ.get("SETTLE_QUIET_MS", "100")),
+        )
+
+
+@dataclass
+class SettleResult:
+    settled: bool
+    waited_ms: float
+    reason: str = ""
+
+    def describe(self) -> str:
+        if self.settled:
+            return f"UI settled after {self.waited_ms:.0f} ms."
+        return f"UI still busy ({self.reason}) after {self.waited_ms:.0f} ms cap."
+
+
+class _NetworkTracker:
+    """Counts in-flight requests of a page from Playwright's request events."""
+
+    def __init__(self, page: Any) -> None:
+        self.inflight: set[Any] = set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        page.on("request", self._started)
+        page.on("requestfinished", self._done)
+        page.on("requestfailed", self._done)
+
+    def _started(self, request: Any) -> None:
+        self.inflight.add(request)
+        self._idle.clear()
+
+    def _done(self, request: Any) -> None:
+        self.inflight.discard(request)
+        if not self.inflight:
+            self._idle.set()
+
+    async def wait_idle(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+_trackers: "weakref.WeakKeyDictionary[Any, _NetworkTracker]" = weakref.WeakKeyDictionary()
+
+
+def track_network(page: Any) -> None:
+    """Start counting requests for ``page`` (idempotent)."""
+    if page not in _trackers:
+        _trackers[page] = _NetworkTracker(page)
+
+
+async def wait_for_settle(page: Any, config: SettleConfig) -> SettleResult:
+    """Wait until in-page activity goes quiet or ``config.timeout_ms`` elapses.
+
+    Network tracking starts with the first call for a page, so requests that
+    were already in flight before it are not seen.
+    """
+    track_network(page)
+    tracker = _trackers[page]
+    start = time.perf_counter()
+    deadline = start + config.timeout_ms / 1000
+
+    def elapsed_ms() -> float:
+        return (time.perf_counter() - start) * 1000
+
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return SettleResult(False, elapsed_ms(), "timeout")
+        result = await page.evaluate(
+            _SETTLE_JS, {"quietMs": config.quiet_ms, "timeoutMs": remaining * 1000}
+        )
+        if not result.get("settled"):
+            reason = "animation" if result.get("animating") else "dom mutations"
+            return SettleResult(False, elapsed_ms(), reason)
+        if not tracker.inflight:
+            return SettleResult(True, elapsed_ms())
+        # DOM is quiet but requests are pending: their responses will likely
+        # re-render, so wait for the network and check the DOM again.
+        if not await tracker.wait_idle(deadline - time.perf_counter()):
+            return SettleResult(False, elapsed_ms(), f"{len(tracker.inflight)} requests pending")
+
+
+__all__ = ["SettleConfig", "SettleResult", "track_network", "wait_for_settle"]
@@ -0,0 +1,182 @@
+"""Startup orchestration: readiness probes and eager browser warm-up.
+
+Instead of fixed sleeps, ``initialize_environment`` waits on the things an
+episode really needs (preview server answering 200, X socket present when
+headed, browser reachable over CDP) while launching and warming Chromium
+concurrently. Every phase lands in :data:`timeline`.
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, TypeVar
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+STARTUP_TIMEOUT_S = float(os.environ.get("STARTUP_TIMEOUT_S", "60"))
+
+
+@dataclass
+class StartupTimeline:
+    """Start/end offsets of each startup phase, in ms since this module loaded."""
+
+    origin: float = field(default_factory=time.perf_counter)
+    phases: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+    async def track(self, name: str, awaitable: Awaitable[T]) -> T:
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = await awaitable
+            ok = True
+            return result
+        finally:
+            end = time.perf_counter()
+            self.phases[name] = {
+                "start_ms": round((start - self.origin) * 1000, 1),
+                "end_ms": round((end - self.origin) * 1000, 1),
+                "ok": ok,
+            }
+
+    def snapshot(self) -> dict[str, Any]:
+        total = max((p["end_ms"] for p in self.phases.values()), default=0.0)
+        return {"total_ms": total, "phases": dict(self.phases)}
+
+    def describe(self) -> str:
+        return ", ".join(
+            f"{name} {p['end_ms'] - p['start_ms']:.0f} ms{'' if p['ok'] else ' (failed)'}"
+            for name, p in sorted(self.phases.items(), key=lambda kv: kv[1]["start_ms"])
+        )
+
+
+timeline = StartupTimeline()
+
+
+async def _poll(check: Any, what: str, timeout: float) -> None:
+    """Call ``check`` with a short backoff until it returns truthy."""
+    deadline = time.perf_counter() + timeout
+    delay = 0.01
+    while True:
+        if await check():
+            return
+        if time.perf_counter() >= deadline:
+            raise TimeoutError(f"{what} not ready after {timeout:.0f}s")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.25)
+
+
+async def _http_status(url: str) -> int | None:
+    """Status code of a GET to ``url``, or None if nothing is listening yet."""
+    parsed = urlparse(url)
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(parsed.hostname, port, ssl=parsed.scheme == "https"), 2
+        )
+    except (OSError, asyncio.TimeoutError):
+        return None
+    try:
+        path = parsed.path or "/"
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {parsed.netloc}\r\nConnection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), 2)
+        parts = status_line.split()
+        return int(parts[1]) if len(parts) > 1 else None
+    except (OSError, ValueError, asyncio.TimeoutError):
+        return None
+    finally:
+        writer.close()
+
+
+async def wait_for_http(url: str, timeout: float = STARTUP_TIMEOUT_S) -> None:
+    """Wait until ``url`` answers 200."""
+
+    async def ready() -> bool:
+        return await _http_status(url) == 200
+
+    await _poll(ready, url, timeout)
+
+
+async def wait_for_x_socket(display: str | None = None, timeout: float = STARTUP_TIMEOUT_S) -> None:
+    """Wait until the X server socket for ``display`` (default $DISPLAY) exists."""
+    display = display or os.environ.get("DISPLAY", ":1")
+    number = display.split(":")[-1].split(".")[0]
+    socket = Path(f"/tmp/.X11-unix/X{number}")
+
+    async def ready() -> bool:
+        return socket.exists()
+
+    await _poll(ready, f"X display {display}", timeout)
+
+
+async def wait_for_cdp(playwright_tool: Any) -> str:
+    """Confirm the browser answers over CDP; return its product string."""
+    browser = playwright_tool._browser
+    if browser is None:
+        raise RuntimeError("Browser not launched")
+    session = await browser.new_browser_cdp_session()
+    try:
+        version = await session.send("Browser.getVersion")
+    finally:
+        await session.detach()
+    return version.get("product", "")
+
+
+async def _launch_and_warm(playwright_tool: Any, pool: Any, headless: bool) -> None:
+    if not headless and not playwright_tool._cdp_url:
+        await timeline.track("x_socket", wait_for_x_socket())
+    await timeline.track("browser_launch", playwright_tool._ensure_browser())
+    product = await timeline.track("cdp", wait_for_cdp(playwright_tool))
+    logger.info("Browser reachable over CDP: %s", product)
+    if pool is not None:
+        await timeline.track("pool_warm", pool.warm())
+
+
+async def orchestrate_startup(
+    playwright_tool: Any,
+    pool: Any = None,
+    base_url: str | None = None,
+    require_preview: bool = False,
+) -> dict[str, Any]:
+    """Probe the preview server while launching and warming the browser.
+
+    A browser that fails to start raises. A preview server that never answers
+    raises too when ``require_preview`` is set (the app is served only by npm
+    preview, so no episode could run); otherwise it is logged and tools that
+    do not need it keep working.
+    """
+    headless = os.environ.get("PLAYWRIGHT_HEADLESS", "1").lower() in ("1", "true", "yes")
+    base_url = base_url if base_url is not None else os.getenv("UI_CUBE_BASE_URL", "http://localhost:3000")
+
+    tasks = [_launch_and_warm(playwright_tool, pool, headless)]
+    if base_url:
+        tasks.append(timeline.track("preview_server", wait_for_http(base_url)))
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    browser_result = results[0]
+    preview_error = results[1] if len(results) > 1 and isinstance(results[1], BaseException) else None
+    if preview_error is not None:
+        logger.error("Preview server at %s not ready: %s", base_url, preview_error)
+    logger.info("Startup timeline: %s", timeline.describe())
+    if isinstance(browser_result, BaseException):
+        raise browser_result
+    if preview_error is not None and require_preview:
+        raise RuntimeError(f"Preview server at {base_url} did not come up: {preview_error}")
+    return timeline.snapshot()
+
+
+__all__ = [
+    "StartupTimeline",
+    "timeline",
+    "wait_for_http",
+    "wait_for_x_socket",
+    "wait_for_cdp",
+    "orchestrate_startup",
+]
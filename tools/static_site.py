@@ -0,0 +1,131 @@
+"""Serve the built benchmark app from memory through Playwright request routing.
+
+With ``UI_CUBE_SERVE=inprocess`` the files under ``STATIC_SITE_DIR`` (the Vite
+``dist`` output) are read once and every request for ``UI_CUBE_BASE_URL`` is
+fulfilled from memory inside the browser's network stack - no Node preview
+server and no loopback TCP hop. Bodies are handed to the browser as-is:
+route handlers cannot see ``accept-encoding`` and there is no network
+transfer for compression to shorten. Unknown paths without a file extension
+fall back to ``index.html`` like ``vite preview`` does.
+"""
+import hashlib
+import logging
+import mimetypes
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIR = "/app/uipath_enterprise_benchmark/DeterministicBenchmark/dist"
+
+
+def serve_mode() -> str:
+    """``"npm"`` (default, preview server on :3000) or ``"inprocess"``."""
+    mode = os.environ.get("UI_CUBE_SERVE", "npm").lower().strip()
+    if mode not in ("npm", "inprocess"):
+        logger.warning("Unknown UI_CUBE_SERVE=%r; using 'npm'", mode)
+        return "npm"
+    return mode
+
+
+@dataclass(frozen=True)
+class Asset:
+    body: bytes
+    content_type: str
+    etag: str
+
+
+class StaticSite:
+    """In-memory copy of a static build, fulfilled via ``context.route``."""
+
+    def __init__(self, root: str | Path, base_url: str) -> None:
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+        self.assets: dict[str, Asset] = {}
+        self.hits = 0
+        self.misses = 0
+        self.load_ms = 0.0
+
+    @classmethod
+    def from_env(cls) -> "StaticSite | None":
+        """Loaded site when ``UI_CUBE_SERVE=inprocess``, else None."""
+        if serve_mode() != "inprocess":
+            return None
+        site = cls(
+            os.environ.get("STATIC_SITE_DIR", DEFAULT_DIR),
+            os.getenv("UI_CUBE_BASE_URL", "http://localhost:3000"),
+        )
+        site.load()
+        return site
+
+    def load(self) -> None:
+        start = time.perf_counter()
+        if not (self.root / "index.html").is_file():
+            raise FileNotFoundError(f"No index.html under {self.root}; build the app first")
+        for path in sorted(self.root.rglob("*")):
+            if path.is_file():
+                self.assets["/" + path.relative_to(self.root).as_posix()] = _make_asset(path)
+        self.load_ms = (time.perf_counter() - start) * 1000
+        logger.info(
+            "Loaded %d static files (%.1f MB in memory) from %s in %.0f ms",
+            len(self.assets),
+            self.resident_bytes / 1e6,
+            self.root,
+            self.load_ms,
+        )
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(len(a.body) for a in self.assets.values())
+
+    def lookup(self, url: str) -> Asset | None:
+        path = urlparse(url).path or "/"
+        if path.endswith("/"):
+            path += "index.html"
+        asset = self.assets.get(path)
+        if asset is None and "." not in path.rsplit("/", 1)[-1]:
+            # Client-side route: the SPA shell handles it
+            asset = self.assets.get("/index.html")
+        return asset
+
+    async def install(self, context: Any) -> None:
+        await context.route(f"{self.base_url}/**", self._handle)
+
+    async def _handle(self, route: Any) -> None:
+        asset = self.lookup(route.request.url)
+        if asset is None:
+            self.misses += 1
+            await route.fulfill(status=404, body=b"Not found", content_type="text/plain")
+            return
+        self.hits += 1
+        headers = {
+            "content-type": asset.content_type,
+            "etag": asset.etag,
+            "cache-control": "no-cache" if asset.content_type.startswith("text/html") else "max-age=31536000",
+        }
+        await route.fulfill(status=200, headers=headers, body=asset.body)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "files": len(self.assets),
+            "resident_bytes": self.resident_bytes,
+            "load_ms": round(self.load_ms, 1),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def _make_asset(path: Path) -> Asset:
+    body = path.read_bytes()
+    content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type == "application/javascript":
+        content_type += "; charset=utf-8"
+    etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+    return Asset(body=body, content_type=content_type, etag=etag)
+
+
+__all__ = ["StaticSite", "serve_mode"]
@@ -0,0 +1,132 @@
+"""Reset browser storage to a clean per-app snapshot before each episode.
+
+The first time an app origin is used, its root page (``{origin}/``, which
+belongs to no task) is loaded in a throwaway context and the resulting
+storage state (cookies and localStorage) is kept as the clean snapshot, so
+no task's own initialization leaks into other tasks' starting state.
+Before every later episode the leased context is restored in one step:
+cookies are cleared and re-seeded, and a blank same-origin document (served
+through request routing, no network) wipes localStorage, sessionStorage and
+IndexedDB and writes the snapshot's localStorage back. The task page then
+loads on exactly the same state every time. The blank document is routed on
+the page only for the duration of a restore: any route on a context turns
+off its HTTP cache.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any
+from urllib.parse import urlparse
+
+from setup.cookies import clear_cookies
+from tools.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RESET_PATH = "/__uicube_reset__"
+
+_RESTORE_JS = """
+async (items) => {
+  localStorage.clear();
+  sessionStorage.clear();
+  if (indexedDB.databases) {
+    const dbs = await indexedDB.databases();
+    await Promise.all(dbs.map(db => new Promise(resolve => {
+      const req = indexedDB.deleteDatabase(db.name);
+      req.onsuccess = req.onerror = req.onblocked = () => resolve();
+    })));
+  }
+  for (const {name, value} of items) localStorage.setItem(name, value);
+}
+"""
+
+
+def _origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+class StorageReset:
+    """Per-origin storage snapshots, restored into leased contexts."""
+
+    def __init__(self, playwright_tool: Any) -> None:
+        self.playwright_tool = playwright_tool
+        self.snapshots: dict[str, dict[str, Any]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    @classmethod
+    def from_env(cls, playwright_tool: Any) -> "StorageReset | None":
+        """Enabled unless ``STORAGE_RESET=off``."""
+        mode = os.environ.get("STORAGE_RESET", "snapshot").lower().strip()
+        if mode in ("off", "0", "false", "no"):
+            return None
+        return cls(playwright_tool)
+
+    @staticmethod
+    async def _serve_blank(route: Any) -> None:
+        await route.fulfill(status=200, content_type="text/html", body="<!doctype html><title>reset</title>")
+
+    async def snapshot(self, origin: str) -> dict[str, Any]:
+        """Clean storage state for ``origin``, captured once from its root page."""
+        if origin in self.snapshots:
+            return self.snapshots[origin]
+        lock = self._locks.setdefault(origin, asyncio.Lock())
+        async with lock:
+            if origin not in self.snapshots:
+                start = time.perf_counter()
+                context = await self.playwright_tool.new_context()
+                try:
+                    page = await context.new_page()
+                    await page.goto(origin + "/", wait_until="networkidle")
+                    self.snapshots[origin] = await context.storage_state()
+                finally:
+                    await context.close()
+                metrics.observe("reset.snapshot", time.perf_counter() - start)
+                logger.info(
+                    "Captured storage snapshot for %s in %.0f ms",
+                    origin,
+                    (time.perf_counter() - start) * 1000,
+                )
+        return self.snapshots[origin]
+
+    async def restore(self, web_name: str, url: str) -> dict:
+        """Restore the clean snapshot of ``url``'s origin into the current session's context."""
+        tool = self.playwright_tool
+        origin = _origin(url)
+        try:
+            state = await self.snapshot(origin)
+            start = time.perf_counter()
+            cleared = await clear_cookies(tool)
+            if not cleared["success"]:
+                return cleared
+            page = tool.page
+            if state.get("cookies"):
+                await page.context.add_cookies(state["cookies"])
+
+            items = next(
+                (o.get("localStorage", []) for o in state.get("origins", []) if o.get("origin") == origin),
+                [],
+            )
+            reset_url = origin + RESET_PATH
+            await page.route(reset_url, self._serve_blank)
+            try:
+                await page.goto(reset_url, wait_until="commit")
+                await page.evaluate(_RESTORE_JS, items)
+            finally:
+                await page.unroute(reset_url, self._serve_blank)
+            elapsed = time.perf_counter() - start
+            metrics.observe("reset.restore", elapsed)
+            return {
+                "success": True,
+                "web_name": web_name,
+                "cookies": len(state.get("cookies", [])),
+                "local_storage": len(items),
+                "elapsed_ms": round(elapsed * 1000, 1),
+            }
+        except Exception as e:
+            logger.error("Storage reset for %s failed: %s", web_name, e)
+            return {"success": False, "error": str(e)}
+
+
+__all__ = ["StorageReset", "RESET_PATH"]
@@ -0,0 +1,517 @@
+"""Browser work sharded across worker processes.
+
+With ``BROWSER_WORKERS=N`` (N > 0) the MCP front end in ``env.py`` starts no
+browser of its own. It launches N worker processes (``python -m
+tools.workers``), each a full in-process environment with its own Playwright
+driver, Chromium, context pool and caches, and forwards scenario and
+executor calls to them over a local socket. A session sticks to the worker
+that ran its first call, and new sessions go to the worker with the fewest.
+Screenshot encoding, input dispatch and page verification then run on N
+cores instead of one event loop.
+
+A worker that dies is restarted on its next call; only the sessions bound
+to it lose their episode, every other worker keeps serving. Sessions idle for
+``WORKER_SESSION_IDLE_S`` lose their affinity, so clients that never finish a
+scenario do not skew placement.
+"""
+import asyncio
+import dataclasses
+import itertools
+import logging
+import os
+import secrets
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any
+
+from hud.tools.executors.base import BaseExecutor
+
+from tools.context_pool import bound_session, session_key
+from tools.encoding import ScreenshotEncoding
+from tools.metrics import MetricsRegistry, metrics
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executor methods a worker will run on behalf of the front end
+EXECUTOR_METHODS = frozenset(
+    {"click", "write", "press", "key", "keydown", "keyup", "scroll", "move", "drag",
+     "mouse_down", "mouse_up", "hold_key", "wait", "screenshot", "zoom", "position",
+     "wait_settled"}
+)
+
+
+class WorkerCrashed(RuntimeError):
+    """Raised for calls in flight on a worker process that exited."""
+
+
+class _Worker:
+    """One worker process and the connection to it."""
+
+    def __init__(self, index: int, loop: asyncio.AbstractEventLoop) -> None:
+        self.index = index
+        self.loop = loop
+        self.process: subprocess.Popen | None = None
+        self.conn: Connection | None = None
+        self.pending: dict[int, asyncio.Future] = {}
+        self.sessions: set[str] = set()
+        self.starts = 0
+        self.live_url: str | None = None
+        self.lock = asyncio.Lock()
+        self._send_lock = threading.Lock()
+        self._ids = itertools.count()
+
+    @property
+    def alive(self) -> bool:
+        return self.conn is not None and self.process is not None and self.process.poll() is None
+
+    async def start(self, timeout: float) -> None:
+        authkey = secrets.token_bytes(32)
+        socket_dir = tempfile.mkdtemp(prefix="uicube-worker-")
+        address = os.path.join(socket_dir, "sock")
+        listener = Listener(address, family="AF_UNIX", authkey=authkey)
+        env = {
+            **os.environ,
+            "BROWSER_WORKERS": "0",
+            "UI_CUBE_WORKER_INDEX": str(self.index),
+            "UI_CUBE_WORKER_AUTHKEY": authkey.hex(),
+        }
+        started = time.perf_counter()
+        # stdout carries the MCP stdio transport; worker output goes to stderr
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "tools.workers", address],
+            cwd=APP_DIR,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=sys.stderr,
+        )
+        try:
+            accept = asyncio.ensure_future(asyncio.to_thread(listener.accept))
+            while not accept.done():
+                if self.process.poll() is not None:
+                    raise WorkerCrashed(
+                        f"Worker {self.index} exited with code {self.process.returncode} during startup"
+                    )
+                if time.perf_counter() - started > timeout:
+                    raise TimeoutError(f"Worker {self.index} did not connect within {timeout:.0f} s")
+                await asyncio.wait({accept}, timeout=0.1)
+            conn = accept.result()
+            # The worker sends one message once its browser is up
+            while not await asyncio.to_thread(conn.poll, 0.5):
+                if self.process.poll() is not None:
+                    raise WorkerCrashed(
+                        f"Worker {self.index} exited with code {self.process.returncode} during startup"
+                    )
+                if time.perf_counter() - started > timeout:
+                    raise TimeoutError(f"Worker {self.index} not ready within {timeout:.0f} s")
+            ready = conn.recv()
+        except BaseException:
+            self.process.kill()
+            raise
+        finally:
+            # Only needed until the worker has connected
+            listener.close()
+            shutil.rmtree(socket_dir, ignore_errors=True)
+
+        self.conn = conn
+        self.live_url = ready.get("live_url")
+        self.starts += 1
+        threading.Thread(
+            target=self._read, args=(conn,), name=f"worker-{self.index}-reader", daemon=True
+        ).start()
+        metrics.observe("workers.start", time.perf_counter() - started)
+        logger.info(
+            "Browser worker %d (pid %d) ready in %.0f ms",
+            self.index,
+            self.process.pid,
+            (time.perf_counter() - started) * 1000,
+        )
+
+    def _read(self, conn: Connection) -> None:
+        while True:
+            try:
+                reply = conn.recv()
+            except (EOFError, OSError):
+                break
+            self.loop.call_soon_threadsafe(self._resolve, reply)
+        self.loop.call_soon_threadsafe(self._lost, conn)
+
+    def _resolve(self, reply: dict[str, Any]) -> None:
+        future = self.pending.pop(reply["id"], None)
+        if future is None or future.done():
+            return
+        if reply["ok"]:
+            future.set_result(reply["result"])
+        else:
+            future.set_exception(RuntimeError(reply["error"]))
+
+    def _lost(self, conn: Connection) -> None:
+        if conn is not self.conn:
+            return
+        self.conn = None
+        code = self.process.poll() if self.process else None
+        logger.error(
+            "Browser worker %d exited (code %s); failing %d calls from %d sessions",
+            self.index,
+            code,
+            len(self.pending),
+            len(self.sessions),
+        )
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(WorkerCrashed(f"Browser worker {self.index} exited"))
+        self.pending.clear()
+
+    async def call(self, message: dict[str, Any]) -> Any:
+        if self.conn is None:
+            raise WorkerCrashed(f"Browser worker {self.index} is not running")
+        request_id = next(self._ids)
+        future = self.loop.create_future()
+        self.pending[request_id] = future
+        try:
+            with self._send_lock:
+                self.conn.send({"id": request_id, **message})
+        except (OSError, ValueError) as e:
+            self.pending.pop(request_id, None)
+            raise WorkerCrashed(f"Browser worker {self.index}: {e}") from e
+        return await future
+
+    async def stop(self) -> None:
+        if self.conn is not None:
+            try:
+                await asyncio.wait_for(self.call({"op": "shutdown", "session": ""}), timeout=10)
+            except Exception:
+                pass
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                await asyncio.to_thread(self.process.wait, 10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.conn = None
+
+
+class WorkerPool:
+    """Front-end side of ``BROWSER_WORKERS`` worker processes."""
+
+    def __init__(self, size: int, start_timeout: float | None = None) -> None:
+        self.size = size
+        self.start_timeout = start_timeout or float(os.environ.get("WORKER_START_TIMEOUT_S", "120"))
+        self.session_idle_s = float(os.environ.get("WORKER_SESSION_IDLE_S", "1800"))
+        self.workers: list[_Worker] = []
+        self.affinity: dict[str, _Worker] = {}
+        self.last_used: dict[str, float] = {}
+        self.restarts = 0
+
+    @classmethod
+    def from_env(cls) -> "WorkerPool | None":
+        """``BROWSER_WORKERS`` worker processes (default 0: browser in this process)."""
+        size = int(os.environ.get("BROWSER_WORKERS") or 0)
+        return cls(size) if size > 0 else None
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self.workers = [_Worker(i, loop) for i in range(self.size)]
+        results = await asyncio.gather(
+            *(w.start(self.start_timeout) for w in self.workers), return_exceptions=True
+        )
+        failed = [r for r in results if isinstance(r, BaseException)]
+        if failed:
+            # Do not leave the workers that did start running without an owner
+            await self.close()
+            raise failed[0]
+
+    def _unbind_idle(self, now: float) -> None:
+        for session, used in list(self.last_used.items()):
+            if now - used > self.session_idle_s:
+                logger.info("Session %s idle for %.0f s; dropping worker affinity", session, now - used)
+                self.unbind(session)
+
+    def _worker_for(self, session: str) -> _Worker:
+        now = time.monotonic()
+        self._unbind_idle(now)
+        self.last_used[session] = now
+        worker = self.affinity.get(session)
+        if worker is None:
+            worker = min(self.workers, key=lambda w: (len(w.sessions), len(w.pending)))
+            worker.sessions.add(session)
+            self.affinity[session] = worker
+        return worker
+
+    async def _ensure_running(self, worker: _Worker) -> None:
+        if worker.alive:
+            return
+        async with worker.lock:
+            if worker.alive:
+                return
+            if worker.process and worker.process.poll() is None:
+                worker.process.kill()
+            self.restarts += 1
+            logger.warning("Restarting browser worker %d", worker.index)
+            await worker.start(self.start_timeout)
+
+    async def call(self, op: str, session: str | None = None, **payload: Any) -> Any:
+        """Run ``op`` for ``session`` on the session's worker."""
+        session = session or session_key()
+        worker = self._worker_for(session)
+        await self._ensure_running(worker)
+        return await worker.call({"op": op, "session": session, **payload})
+
+    def unbind(self, session: str) -> None:
+        """Let ``session``'s next episode be placed on any worker."""
+        self.last_used.pop(session, None)
+        worker = self.affinity.pop(session, None)
+        if worker:
+            worker.sessions.discard(session)
+
+    async def telemetry(self, timeout: float = 5.0) -> list[dict[str, Any]]:
+        """Telemetry of every running worker (unresponsive ones are skipped)."""
+
+        async def ask(worker: _Worker) -> dict[str, Any] | None:
+            if not worker.alive:
+                return None
+            try:
+                reply = await asyncio.wait_for(
+                    worker.call({"op": "telemetry", "session": ""}), timeout=timeout
+                )
+            except Exception as e:
+                logger.warning("No telemetry from browser worker %d: %s", worker.index, e)
+                return None
+            return {"index": worker.index, **reply}
+
+        replies = await asyncio.gather(*(ask(w) for w in self.workers))
+        return [r for r in replies if r is not None]
+
+    async def metrics(self) -> MetricsRegistry:
+        """This process's metrics merged with every worker's."""
+        merged = MetricsRegistry(enabled=True)
+        merged.merge(metrics.export())
+        for reply in await self.telemetry():
+            merged.merge(reply["metrics"])
+        return merged
+
+    async def close(self) -> None:
+        await asyncio.gather(*(w.stop() for w in self.workers), return_exceptions=True)
+        self.workers = []
+        self.affinity.clear()
+        self.last_used.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": self.size,
+            "restarts": self.restarts,
+            "sessions": len(self.affinity),
+            "workers": [
+                {
+                    "index": w.index,
+                    "pid": w.process.pid if w.process else None,
+                    "alive": w.alive,
+                    "sessions": len(w.sessions),
+                    "in_flight": len(w.pending),
+                    "starts": w.starts,
+                    "live_url": w.live_url,
+                }
+                for w in self.workers
+            ],
+        }
+
+
+def _forward(method: str):
+    async def call(self: "RemoteExecutor", *args: Any, **kwargs: Any) -> Any:
+        return await self.pool.call(
+            "executor",
+            method=method,
+            args=args,
+            kwargs=kwargs,
+            encoding=self._encoding,
+            dedup=self.dedup,
+        )
+
+    call.__name__ = method
+    return call
+
+
+class RemoteExecutor(BaseExecutor):
+    """Executor that runs each action on the calling session's worker."""
+
+    def __init__(
+        self,
+        pool: WorkerPool,
+        encoding: ScreenshotEncoding | None = None,
+        dedup: bool | None = None,
+    ) -> None:
+        super().__init__(None)
+        self.pool = pool
+        self.encoding = encoding
+        self.dedup = dedup
+        # Accepted by BrowserExecutor.write; set so computer_batch passes modes through
+        self.write_mode = "type"
+
+    @property
+    def _encoding(self) -> dict[str, Any] | None:
+        return dataclasses.asdict(self.encoding) if self.encoding else None
+
+    def with_encoding(
+        self, encoding: ScreenshotEncoding, dedup: bool | None = None
+    ) -> "RemoteExecutor":
+        """Return a view whose frames the worker encodes with ``encoding``."""
+        return RemoteExecutor(self.pool, encoding, dedup)
+
+
+for _method in EXECUTOR_METHODS:
+    setattr(RemoteExecutor, _method, _forward(_method))
+
+
+# ---------------------------------------------------------------------------
+# Worker process side
+# ---------------------------------------------------------------------------
+
+
+class _WorkerServer:
+    """Runs front-end requests against this process's environment."""
+
+    def __init__(self, env_module: Any, conn: Connection) -> None:
+        self.env = env_module
+        self.conn = conn
+        self.episodes: dict[str, Any] = {}
+        self.views: dict[tuple, Any] = {}
+        self._send_lock = threading.Lock()
+
+    def _executor(self, encoding: dict[str, Any] | None, dedup: bool | None) -> Any:
+        executor = self.env.browser_executor
+        if not encoding or not hasattr(executor, "with_encoding"):
+            return executor
+        key = (tuple(sorted(encoding.items())), dedup)
+        if key not in self.views:
+            self.views[key] = executor.with_encoding(ScreenshotEncoding(**encoding), dedup=dedup)
+        return self.views[key]
+
+    async def _run(self, request: dict[str, Any]) -> Any:
+        from scenarios.deterministic import deterministic_scenario
+
+        op = request["op"]
+        session = request["session"]
+        if op == "executor":
+            method = request["method"]
+            if method not in EXECUTOR_METHODS:
+                raise ValueError(f"Unknown executor method: {method}")
+            executor = self._executor(request.get("encoding"), request.get("dedup"))
+            return await getattr(executor, method)(*request["args"], **request["kwargs"])
+        if op == "scenario_start":
+            stale = self.episodes.pop(session, None)
+            if stale is not None:
+                await stale.aclose()
+            episode = deterministic_scenario(request["task_id"])
+            first = await episode.__anext__()
+            if isinstance(first, str):
+                self.episodes[session] = episode
+            else:
+                await episode.aclose()
+            return first
+        if op == "scenario_finish":
+            episode = self.episodes.pop(session, None)
+            if episode is None:
+                raise RuntimeError("No episode in progress for this session (worker restarted?)")
+            try:
+                return await episode.__anext__()
+            finally:
+                await episode.aclose()
+        if op == "scenario_abort":
+            # The client abandoned the episode: release its context now
+            episode = self.episodes.pop(session, None)
+            if episode is not None:
+                await episode.aclose()
+            return None
+        if op == "telemetry":
+            return self._telemetry()
+        raise ValueError(f"Unknown worker op: {op}")
+
+    def _telemetry(self) -> dict[str, Any]:
+        from tools.frames import frame_stats
+
+        env = self.env
+        return {
+            "pid": os.getpid(),
+            "episodes": len(self.episodes),
+            "metrics": metrics.export(),
+            "frames": frame_stats(),
+            "scheduler": env.episode_scheduler.stats() if env.episode_scheduler else None,
+            "static_site": env.static_site.stats() if env.static_site else None,
+            "asset_cache": env.asset_cache.stats() if env.asset_cache else None,
+            "live_view": env.live_view.stats() if env.live_view else None,
+        }
+
+    async def handle(self, request: dict[str, Any]) -> None:
+        with bound_session(request["session"]):
+            try:
+                reply = {"id": request["id"], "ok": True, "result": await self._run(request)}
+            except Exception as e:
+                logger.exception("Worker request %s failed", request["op"])
+                reply = {"id": request["id"], "ok": False, "error": f"{type(e).__name__}: {e}"}
+        try:
+            with self._send_lock:
+                self.conn.send(reply)
+        except Exception as e:
+            # e.g. an unpicklable result; report it instead of hanging the caller
+            logger.error("Could not send reply for %s: %s", request["op"], e)
+            with self._send_lock:
+                self.conn.send({"id": request["id"], "ok": False, "error": str(e)})
+
+    async def serve(self) -> None:
+        loop = asyncio.get_running_loop()
+        requests: asyncio.Queue = asyncio.Queue()
+
+        def read() -> None:
+            while True:
+                try:
+                    message = self.conn.recv()
+                except (EOFError, OSError):
+                    message = None
+                loop.call_soon_threadsafe(requests.put_nowait, message)
+                if message is None:
+                    return
+
+        threading.Thread(target=read, name="worker-requests", daemon=True).start()
+        tasks: set[asyncio.Task] = set()
+        while True:
+            request = await requests.get()
+            if request is None:
+                break
+            if request["op"] == "shutdown":
+                with self._send_lock:
+                    self.conn.send({"id": request["id"], "ok": True, "result": None})
+                break
+            task = asyncio.create_task(self.handle(request))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        for task in tasks:
+            task.cancel()
+        for episode in self.episodes.values():
+            await episode.aclose()
+        await self.env.shutdown_environment()
+
+
+async def _worker_main(address: str) -> None:
+    authkey = bytes.fromhex(os.environ["UI_CUBE_WORKER_AUTHKEY"])
+    conn = Client(address, family="AF_UNIX", authkey=authkey)
+
+    import env as env_module
+
+    await env_module.initialize_environment()
+    live_view = env_module.live_view
+    conn.send({"ready": True, "pid": os.getpid(), "live_url": live_view.url if live_view else None})
+    await _WorkerServer(env_module, conn).serve()
+
+
+__all__ = ["RemoteExecutor", "WorkerCrashed", "WorkerPool", "EXECUTOR_METHODS"]
+
+
+if __name__ == "__main__":
+    asyncio.run(_worker_main(sys.argv[1]))